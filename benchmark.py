@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the MCP server.
+
+    python benchmark.py serialization            # stdlib json vs orjson on the server's own payloads
+    python benchmark.py load --url http://localhost:8000/sse --tool get_weather --calls 500
+    python benchmark.py compare                  # spawn the server with FAST_MODE off/on and load both
+    python benchmark.py startup                  # server import time and time until /healthz answers
+
+`compare` runs the server with mocked Google/meteoblue responses, so it needs no API keys
+and measures the server itself (event loop, MCP/SSE handling, tool code), not upstream latency.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+import urllib.request
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+DEFAULT_TOOL = "search_nearby"
+DEFAULT_ARGS = {"latitude": 48.8584, "longitude": 2.2945, "keyword": "hotel"}
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+# --- serialization ---
+
+def sample_payloads():
+    """A trace record and a nearby-cache snapshot entry shaped like the real ones."""
+    from tools.fixtures import mock_nearby_results
+    from tools.google_nearby import to_place
+    from tools.places import encode_places
+
+    places = [to_place(r) for r in mock_nearby_results(48.8584, 2.2945)] * 4
+    spans = [
+        {"span_id": f"{i:016x}", "name": "upstream.google.places_nearby", "start": 1.0 + i,
+         "duration_ms": 123.4, "attributes": {"provider": "google", "result_count": 20}}
+        for i in range(12)
+    ]
+    trace = {"trace_id": "0" * 32, "span_id": "1" * 16, "name": "tool.search_nearby", "start": 0.0,
+             "duration_ms": 456.7, "attributes": {"output_chars": 2400}, "spans": spans}
+    return {"trace record": trace, "snapshot entry": encode_places(places)}
+
+def run_serialization(args):
+    try:
+        import orjson
+    except ImportError:
+        print("orjson is not installed (pip install orjson); nothing to compare")
+        return
+    print(f"{'payload':<16} {'json dumps':>12} {'orjson dumps':>13} {'json loads':>12} {'orjson loads':>13}")
+    for name, payload in sample_payloads().items():
+        text = json.dumps(payload, separators=(",", ":"), default=str)
+        timings = [
+            timeit.timeit(lambda: json.dumps(payload, separators=(",", ":"), default=str), number=args.number),
+            timeit.timeit(lambda: orjson.dumps(payload, default=str), number=args.number),
+            timeit.timeit(lambda: json.loads(text), number=args.number),
+            timeit.timeit(lambda: orjson.loads(text), number=args.number),
+        ]
+        print(f"{name:<16} " + " ".join(f"{t / args.number * 1e6:>10.1f}us" for t in timings))
+
+# --- load ---
+
+async def run_load(url, tool, tool_args, sessions, calls, headers=None):
+    """Run `calls` tool calls over `sessions` concurrent MCP sessions; returns per-call latencies (s) and wall time."""
+    from mcp.client.session import ClientSession
+    from mcp.client.sse import sse_client
+
+    latencies = []
+    errors = 0
+    remaining = calls
+
+    async def worker():
+        nonlocal remaining, errors
+        async with sse_client(url, headers=headers or {}) as (read_stream, write_stream):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+                while remaining > 0:
+                    remaining -= 1
+                    started = time.perf_counter()
+                    result = await session.call_tool(tool, arguments=tool_args)
+                    latencies.append(time.perf_counter() - started)
+                    if result.isError:
+                        errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(sessions)))
+    return latencies, time.perf_counter() - started, errors
+
+def report(label, latencies, wall, errors):
+    print(
+        f"{label:<12} {len(latencies) / wall:>8.1f} calls/s   p50 {percentile(latencies, 0.5) * 1000:>7.2f} ms   "
+        f"p95 {percentile(latencies, 0.95) * 1000:>7.2f} ms   mean {statistics.mean(latencies) * 1000:>7.2f} ms"
+        + (f"   errors {errors}" if errors else "")
+    )
+
+def load_command(args):
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    tool_args = json.loads(args.args)
+    latencies, wall, errors = asyncio.run(run_load(args.url, args.tool, tool_args, args.sessions, args.calls, headers))
+    report(args.tool, latencies, wall, errors)
+
+# --- compare ---
+
+def wait_healthy(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} did not become healthy within {timeout}s")
+
+def start_server(port, env_overrides):
+    env = dict(os.environ)
+    env.update({
+        "TRANSPORT": "sse", "HOST": "127.0.0.1", "PORT": str(port),
+        "MOCK_GOOGLE_API": "true", "MOCK_WEATHER_API": "true", "CACHE_SNAPSHOT_PATH": "",
+        # Let the benchmark, not load shedding, decide the concurrency
+        "TOOL_MAX_CONCURRENCY": "1000", "TOOL_MAX_QUEUE": "1000",
+    })
+    env.update(env_overrides)
+    return subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "src", "server.py")],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+def compare_command(args):
+    tool_args = json.loads(args.args)
+    for label, overrides in (("baseline", {"FAST_MODE": "false"}), ("fast mode", {"FAST_MODE": "true"})):
+        server = start_server(args.port, overrides)
+        try:
+            wait_healthy(args.port)
+            url = f"http://127.0.0.1:{args.port}/sse"
+            # Warm-up, then the measured run
+            asyncio.run(run_load(url, args.tool, tool_args, args.sessions, args.sessions * 5))
+            latencies, wall, errors = asyncio.run(run_load(url, args.tool, tool_args, args.sessions, args.calls))
+            report(label, latencies, wall, errors)
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+# --- startup ---
+
+IMPORT_SNIPPET = "import time; started = time.perf_counter(); import server; print(time.perf_counter() - started)"
+
+def startup_command(args):
+    env = dict(os.environ, MOCK_GOOGLE_API="true", MOCK_WEATHER_API="true", CACHE_SNAPSHOT_PATH="", WARMUP_DELAY="-1")
+    imports, ready = [], []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET], cwd=os.path.join(ROOT, "src"), env=env,
+            capture_output=True, text=True, check=True
+        ).stdout
+        imports.append(float(output.strip().splitlines()[-1]))
+
+        started = time.perf_counter()
+        server = start_server(args.port, {"WARMUP_DELAY": "-1"})
+        try:
+            wait_healthy(args.port)
+            ready.append(time.perf_counter() - started)
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+    print(f"{'import server':<22} median {statistics.median(imports) * 1000:>7.1f} ms   min {min(imports) * 1000:>7.1f} ms")
+    print(f"{'spawn to /healthz':<22} median {statistics.median(ready) * 1000:>7.1f} ms   min {min(ready) * 1000:>7.1f} ms")
+
+    if args.importtime:
+        # Slowest modules by cumulative import time (python -X importtime)
+        stderr = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import server"], cwd=os.path.join(ROOT, "src"), env=env,
+            capture_output=True, text=True
+        ).stderr
+        rows = []
+        for line in stderr.splitlines():
+            parts = line.split("|")
+            if len(parts) == 3 and parts[1].strip().isdigit():
+                rows.append((int(parts[1]), parts[2].rstrip()))
+        for cumulative, module in sorted(rows, reverse=True)[:args.importtime]:
+            print(f"{cumulative / 1000:>9.1f} ms  {module}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serialization = commands.add_parser("serialization", help="stdlib json vs orjson micro-benchmark")
+    serialization.add_argument("--number", type=int, default=2000)
+    serialization.set_defaults(func=run_serialization)
+
+    for name, func in (("load", load_command), ("compare", compare_command)):
+        command = commands.add_parser(name)
+        command.add_argument("--tool", default=DEFAULT_TOOL)
+        command.add_argument("--args", default=json.dumps(DEFAULT_ARGS), help="Tool arguments as JSON")
+        command.add_argument("--sessions", type=int, default=8, help="Concurrent MCP sessions")
+        command.add_argument("--calls", type=int, default=1000, help="Total tool calls")
+        command.set_defaults(func=func)
+        if name == "load":
+            command.add_argument("--url", default=os.environ.get("MCP_URL", "http://localhost:8000/sse"))
+            command.add_argument("--token", default=os.environ.get("MCP_AUTH_TOKEN"), help="Bearer token (via Nginx)")
+        else:
+            command.add_argument("--port", type=int, default=8765)
+
+    startup = commands.add_parser("startup", help="Server import and spawn-to-ready time")
+    startup.add_argument("--runs", type=int, default=5)
+    startup.add_argument("--port", type=int, default=8765)
+    startup.add_argument("--importtime", type=int, default=0, metavar="N", help="Also list the N slowest imports")
+    startup.set_defaults(func=startup_command)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,32 @@
 from fastmcp import FastMCP
-from tools.google_nearby import get_nearby_places
-from tools.geocoding import geocode_address
-from tools.weather import weather_service
-from tools.distance import calculate_distance
-from typing import Optional
+from tools.google_nearby import get_nearby_places_multi, place_photo_url
+from tools.area_search import search_area as sweep_area
+from tools.geocoding import geocode_address, geocode_addresses
+from tools.weather import get_weather_service
+from tools.forecast import AGGREGATIONS, MAX_HORIZON_HOURS
+from tools.distance import calculate_distance, distance_matrix
+from tools.result_sets import store_result_set, load_result_set, place_coordinates
+from tools.places import Place
+from tools.reachability import filter_reachable, MAX_REACH_CANDIDATES, MAX_REACH_RESULTS
+from tools.prefetch import prefetcher
+from tools.snapshot import snapshotter
+from tools.warmup import schedule_warm_up
+from tools.tracing import child_span, traced_tool
+from tools.admission import admission_controlled, admission_stats
+from tools.providers import provider_stats
+from tools.transport import transport_stats
+from tools import speedups
+from tools.deadline import with_deadline
+from tools.profiling import (
+    ADMIN_TOKEN, PROFILE_MAX_SECONDS, ProfilerBusyError, profiler, profiled, profiled_tools,
+    format_pstats, dump_pstats
+)
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from contextlib import asynccontextmanager
+from typing import List, Optional, Union
+import asyncio
+import hmac
 import os
 import logging # Mantener para logs generales del servidor
 
@@ -11,47 +34,344 @@ import logging # Mantener para logs generales del servidor
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+def start_background_tasks() -> None:
+    """Start the prefetcher and cache snapshot loops on the server's event loop (idempotent)."""
+    prefetcher.ensure_started()
+    snapshotter.ensure_started()
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    # Start the loops with the server, not on the first tool call, so every replica runs them
+    # whichever tools it serves. The snapshot is also written at exit (atexit).
+    start_background_tasks()
+    yield
+
 # Initialize FastMCP server
 mcp = FastMCP(
     name="Google Nearby Search MCP",
     version="1.0.0",
     debug=True,
+    lifespan=lifespan,
     strict_input_validation=False  # Disable strict validation to avoid parameter issues
 )
 
+# Upper bound for multi-location tools, keeps a single call from fanning out unboundedly
+MAX_BATCH_LOCATIONS = int(os.environ.get("MAX_BATCH_LOCATIONS", "25"))
+MAX_AREA_RESULTS = 60
+
+# FAST_MODE: uvloop must be installed before `fastmcp run` / mcp.run() create the event loop
+logger.info(f"Event loop: {speedups.install_event_loop()}, JSON: {speedups.status()['json']}")
+
+# Warm start: restore caches saved by the previous process (entries are decoded lazily)
+snapshotter.load()
+
+# Import the lazily loaded upstream libraries in the background once the server is up
+schedule_warm_up()
+
+@mcp.custom_route("/healthz", methods=["GET"])
+async def healthz(request: Request) -> JSONResponse:
+    """Liveness probe used by docker-compose and the Nginx proxy (not an MCP tool)."""
+    return JSONResponse({"status": "ok", "pid": os.getpid()})
+
+@mcp.custom_route("/stats", methods=["GET"])
+async def stats(request: Request) -> JSONResponse:
+    """Per-tool admission metrics, upstream provider health and connection reuse for this replica."""
+    return JSONResponse({
+        "pid": os.getpid(),
+        "tools": admission_stats(),
+        "providers": provider_stats(),
+        "upstream": transport_stats(),
+        "speedups": speedups.status(),
+    })
+
+@mcp.custom_route("/admin/profile", methods=["GET"])
+async def admin_profile(request: Request) -> Response:
+    """
+    Profile this worker on demand. Requires ADMIN_TOKEN in the X-Admin-Token header.
+
+    Query parameters:
+        mode: "sample" (default) for collapsed stacks of all threads (flamegraph.pl / speedscope),
+              or "cprofile" for pstats output.
+        seconds: Duration (default 10, max PROFILE_MAX_SECONDS).
+        tool: Only profile this tool. With mode=cprofile, the next `calls` calls of the tool are profiled.
+        calls: Number of tool calls to profile with mode=cprofile (default 1).
+        format: "raw" returns the binary pstats file instead of text (mode=cprofile).
+    """
+    if not ADMIN_TOKEN or not hmac.compare_digest(request.headers.get("x-admin-token", ""), ADMIN_TOKEN):
+        return JSONResponse({"error": "Forbidden"}, status_code=403)
+
+    params = request.query_params
+    mode = params.get("mode", "sample")
+    tool = params.get("tool")
+    try:
+        seconds = min(max(float(params.get("seconds", "10")), 0.1), PROFILE_MAX_SECONDS)
+        calls = max(int(params.get("calls", "1")), 1)
+    except ValueError:
+        return JSONResponse({"error": "seconds and calls must be numbers"}, status_code=400)
+    if mode not in ("sample", "cprofile"):
+        return JSONResponse({"error": "mode must be 'sample' or 'cprofile'"}, status_code=400)
+    if mode == "cprofile" and tool is not None and tool not in profiled_tools:
+        return JSONResponse({"error": f"Unknown tool '{tool}'", "tools": sorted(profiled_tools)}, status_code=400)
+
+    logger.info(f"Profiling requested: mode={mode} seconds={seconds} tool={tool} calls={calls}")
+    try:
+        if mode == "sample":
+            return PlainTextResponse(await profiler.sample(seconds, tool))
+        if tool is not None:
+            profile, count = await profiler.profile_tool(tool, calls, seconds)
+            header = f"# {count} call(s) of {tool} profiled\n"
+            if count == 0:
+                # Nothing to format or dump (pstats rejects an empty profile)
+                return PlainTextResponse(f"# 0 calls of {tool} profiled in {seconds:g}s\n")
+        else:
+            profile = await profiler.profile_loop(seconds)
+            header = f"# Event loop thread profiled for {seconds:g}s\n"
+    except ProfilerBusyError as e:
+        return JSONResponse({"error": str(e)}, status_code=409)
+
+    if params.get("format") == "raw":
+        return Response(dump_pstats(profile), media_type="application/octet-stream")
+    return PlainTextResponse(header + format_pstats(profile))
+
 # --- OLD AUTHENTICATION MIDDLEWARE REMOVED ---
 # La clase ASGIAuthMiddleware y su registro han sido eliminados.
 
+def format_places(results: List[Place], header: str, travel: Optional[List[str]] = None) -> str:
+    """
+    Format a list of places as the readable block shared by the search tools.
+    travel: Optional travel time description per place (same order as results).
+    """
+    formatted_results = [f"{header}\n"]
+    for idx, place in enumerate(results, 1):
+        name = place.name
+        vicinity = place.address
+        rating = place.rating if place.rating is not None else "N/A"
+        user_ratings_total = place.user_ratings_total
+        place_id = place.place_id
+        business_status = place.business_status
+        photo_url = place_photo_url(place)
+        maps_url = place.maps_url
+    
+        # Format ratings
+        ratings_str = f"Rating: {rating}"
+        if user_ratings_total:
+            ratings_str += f" ({user_ratings_total} reviews)"
+    
+        # Format business status
+        status_str = ""
+        if business_status:
+            status_str = f" | Status: {business_status}"
+    
+        formatted_results.append(
+            f"{idx}. {name}\n"
+            f"   {ratings_str}{status_str}\n"
+            f"   Address: {vicinity}"
+        )
+        if travel:
+            formatted_results.append(f"   Travel: {travel[idx - 1]}")
+        if maps_url:
+            formatted_results.append(f"   View on Google Maps: {maps_url}")
+        if photo_url:
+            formatted_results.append(f"   Photo: {photo_url}")
+        if place_id:
+            formatted_results.append(f"   Place ID: {place_id}")
+        formatted_results.append("")  # Empty line between places
+    
+    return "\n".join(formatted_results).strip()
+
+def result_set_footer(results: List[Place]) -> str:
+    """Store search results server-side and describe how to reference them from other tools."""
+    result_set_id = store_result_set(results)
+    return (
+        f"Result set ID: {result_set_id} (pass as result_set_id, optionally with indices, "
+        "to calculate_travel_distance or get_weather instead of re-sending names or addresses)"
+    )
+
+def result_set_distances(
+    origin: Optional[str],
+    destination: Optional[str],
+    mode: str,
+    departure_time: Optional[int],
+    result_set_id: str,
+    indices: Optional[List[int]]
+) -> str:
+    """Distances between every selected place of a result set and a single origin or destination."""
+    if bool(origin) == bool(destination):
+        return "With result_set_id, provide exactly one of origin or destination; the places are used as the other end."
+    try:
+        selected = load_result_set(result_set_id, indices)
+    except ValueError as e:
+        return str(e)
+
+    located = [(idx, place, place_coordinates(place)) for idx, place in selected]
+    points = [f"{coords[0]},{coords[1]}" for _, _, coords in located if coords]
+    if not points:
+        return f"None of the selected places in '{result_set_id}' have coordinates."
+
+    if origin:
+        elements = distance_matrix([origin], points, mode, departure_time=departure_time)[0]
+        lines = [f"Travel from '{origin}' via {mode}:"]
+    else:
+        elements = [row[0] for row in distance_matrix(points, [destination], mode, departure_time=departure_time)]
+        lines = [f"Travel to '{destination}' via {mode}:"]
+
+    element_iter = iter(elements)
+    for idx, place, coords in located:
+        name = place.name
+        if coords is None:
+            lines.append(f"{idx}. {name}: no coordinates available")
+            continue
+        element = next(element_iter)
+        if element.get("error"):
+            return f"Error from Google API: {element['status']}"
+        if element["status"] == "OK":
+            lines.append(f"{idx}. {name}: {element['distance']}, {element['duration']}")
+        else:
+            lines.append(f"{idx}. {name}: Could not calculate distance: {element['status']}")
+    return "\n".join(lines)
+
 @mcp.tool()
-def calculate_travel_distance(origin: str, destination: str, mode: str = "driving") -> str:
+@traced_tool
+@with_deadline
+@admission_controlled
+@profiled
+async def calculate_travel_distance(
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+    mode: str = "driving",
+    departure_time: Optional[int] = None,
+    result_set_id: Optional[str] = None,
+    indices: Optional[List[int]] = None
+) -> str:
     """
     Calculate the travel distance and time between two points (addresses or coordinates).
     Modes: "driving", "walking", "bicycling", "transit".
+    departure_time: Optional Unix timestamp for driving/transit (defaults to now).
+    result_set_id: Optional ID returned by search_nearby/search_area. Its places (or only those at
+                   `indices`, numbered as in the search output) are used as the origins when origin is
+                   omitted, or as the destinations when destination is omitted, in one batched request.
     """
-    logger.info(f"Calculating distance from '{origin}' to '{destination}' via {mode}")
-    return calculate_distance(origin, destination, mode)
+    logger.info(f"Calculating distance from '{origin}' to '{destination}' via {mode} (result set: {result_set_id})")
+    if result_set_id:
+        return await asyncio.to_thread(result_set_distances, origin, destination, mode, departure_time, result_set_id, indices)
+    if not origin or not destination:
+        return "Provide both origin and destination, or a result_set_id with one of them."
+    return await asyncio.to_thread(calculate_distance, origin, destination, mode, departure_time=departure_time)
 
 @mcp.tool()
-async def get_weather(latitude: float, longitude: float) -> str:
+@traced_tool
+@with_deadline
+@admission_controlled
+@profiled
+async def get_weather(
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    result_set_id: Optional[str] = None,
+    indices: Optional[List[int]] = None,
+    horizon_hours: Optional[int] = None,
+    aggregation: Optional[str] = None
+) -> str:
     """
     Get the current weather and forecast for a specific location (latitude/longitude).
     Returns a readable string with temperature, wind, etc.
+    Alternatively pass result_set_id (from search_nearby/search_area) and optional indices to get a
+    compact weather summary for each of those places in one call.
+    horizon_hours: Optional forecast length from now, up to 168 (e.g. 96 for a 4-day stay).
+    aggregation: With horizon_hours: "hourly", "3h", "6h" or "daily" (min/max/mean temperature,
+                 max wind, precipitation and rainy hours per period). Default "hourly" (or "daily" beyond 48h).
     """
-    logger.info(f"get_weather called with: lat={latitude}, lng={longitude}")
+    logger.info(f"get_weather called with: lat={latitude}, lng={longitude}, result_set_id={result_set_id}, horizon_hours={horizon_hours}, aggregation={aggregation}")
+    weather = get_weather_service()
+    if horizon_hours is not None or aggregation is not None:
+        if horizon_hours is None:
+            horizon_hours = 24
+        if not 1 <= horizon_hours <= MAX_HORIZON_HOURS:
+            return f"horizon_hours must be between 1 and {MAX_HORIZON_HOURS}."
+        aggregation = aggregation or ("daily" if horizon_hours > 48 else "hourly")
+        if aggregation not in AGGREGATIONS:
+            return f"aggregation must be one of: {', '.join(AGGREGATIONS)}"
+
+    def render(data: dict) -> str:
+        if horizon_hours is None:
+            return weather.format_weather_for_context(data)
+        return weather.format_weather_forecast(data, horizon_hours, aggregation)
+
+    if result_set_id:
+        try:
+            selected = load_result_set(result_set_id, indices)
+        except ValueError as e:
+            return str(e)
+        located = [(idx, place, place_coordinates(place)) for idx, place in selected]
+        located = [item for item in located if item[2]]
+        if len(located) > MAX_BATCH_LOCATIONS:
+            return f"Too many places ({len(located)}). Pass at most {MAX_BATCH_LOCATIONS} indices per call."
+        results = await weather.get_weather_many([coords for _, _, coords in located])
+        with child_span("format"):
+            lines = []
+            for (idx, place, _), result in zip(located, results):
+                name = place.name
+                if isinstance(result, Exception):
+                    lines.append(f"{idx}. {name}: Failed to get weather: {result}")
+                elif horizon_hours is not None:
+                    lines.append(f"{idx}. {name}\n{render(result)}\n")
+                else:
+                    lines.append(f"{idx}. {name}: {weather.format_weather_summary(result)}")
+            return "\n".join(lines).strip() or f"None of the selected places in '{result_set_id}' have coordinates."
+    if latitude is None or longitude is None:
+        return "Provide latitude and longitude, or a result_set_id."
     try:
-        data = await weather_service.get_weather(latitude, longitude)
-        return weather_service.format_weather_for_context(data)
+        data = await weather.get_weather(latitude, longitude)
+        with child_span("format"):
+            return render(data)
     except Exception as e:
         logger.error(f"get_weather error: {e}")
         return f"Failed to get weather: {e}"
 
 @mcp.tool()
-def get_coordinates(address: str) -> str:
+@traced_tool
+@with_deadline
+@admission_controlled
+@profiled
+async def get_weather_batch(locations: List[str]) -> str:
+    """
+    Get a compact weather summary for several locations in one call.
+    Each location is a "lat,lng" string (e.g. ["48.8584,2.2945", "48.8606,2.3376"]).
+    Use this instead of calling get_weather repeatedly when comparing hotels or cities.
+    """
+    logger.info(f"get_weather_batch called with {len(locations)} locations")
+    weather = get_weather_service()
+    if len(locations) > MAX_BATCH_LOCATIONS:
+        return f"Too many locations ({len(locations)}). Maximum is {MAX_BATCH_LOCATIONS} per call."
+    
+    coordinates = []
+    for raw in locations:
+        try:
+            lat_str, lng_str = raw.split(",")
+            coordinates.append((float(lat_str), float(lng_str)))
+        except ValueError:
+            return f"Invalid location '{raw}'. Expected \"lat,lng\"."
+    
+    results = await weather.get_weather_many(coordinates)
+    with child_span("format"):
+        lines = []
+        for idx, (raw, result) in enumerate(zip(locations, results), 1):
+            if isinstance(result, Exception):
+                lines.append(f"{idx}. ({raw}) Failed to get weather: {result}")
+            else:
+                lines.append(f"{idx}. ({raw}) {weather.format_weather_summary(result)}")
+        return "\n".join(lines)
+
+@mcp.tool()
+@traced_tool
+@with_deadline
+@admission_controlled
+@profiled
+async def get_coordinates(address: str) -> str:
     """
     Convert an address or place name (e.g., "Eiffel Tower", "New York City") into latitude and longitude coordinates.
     Use this tool BEFORE searching for nearby places if you only have a name/address.
     """
-    result = geocode_address(address)
+    result = await asyncio.to_thread(geocode_address, address)
     
     if isinstance(result, dict):
         return f"Coordinates for '{address}': Latitude {result['lat']}, Longitude {result['lng']}"
@@ -59,89 +379,199 @@ def get_coordinates(address: str) -> str:
         return str(result)
 
 @mcp.tool()
-def search_nearby(
+@traced_tool
+@with_deadline
+@admission_controlled
+@profiled
+async def get_coordinates_bulk(addresses: List[str]) -> str:
+    """
+    Convert several addresses or place names into coordinates in one call (e.g. all stops of an itinerary).
+    Results are returned in the same order as the input, with an error message for addresses that could not be found.
+    """
+    logger.info(f"get_coordinates_bulk called with {len(addresses)} addresses")
+    if len(addresses) > MAX_BATCH_LOCATIONS:
+        return f"Too many addresses ({len(addresses)}). Maximum is {MAX_BATCH_LOCATIONS} per call."
+    
+    results = await geocode_addresses(addresses)
+    lines = []
+    for idx, (address, result) in enumerate(zip(addresses, results), 1):
+        if isinstance(result, dict):
+            lines.append(f"{idx}. '{address}': Latitude {result['lat']}, Longitude {result['lng']}")
+        else:
+            lines.append(f"{idx}. {result}")
+    return "\n".join(lines)
+
+@mcp.tool()
+@traced_tool
+@with_deadline
+@admission_controlled
+@profiled
+async def search_nearby(
     latitude: float,
     longitude: float,
     radius: int = 1000,
-    keyword: str = "hotel",
-    type: Optional[str] = None,
+    keyword: Union[str, List[str]] = "hotel",
+    type: Union[str, List[str], None] = None,
     min_price: Optional[int] = None,
     max_price: Optional[int] = None,
     language: Optional[str] = None,
     rankby: Optional[str] = None,
-    name: Optional[str] = None
+    name: Optional[str] = None,
+    ranking: str = "rating",
+    reach_from: Optional[str] = None,
+    reach_mode: str = "walking",
+    max_travel_minutes: Optional[int] = None
 ) -> str:
     """
     Search for nearby places (hotels, restaurants, etc.) using Google Maps API.
-    Returns up to 5 results, sorted by rating (descending).
+    Returns up to 5 results, ordered by the chosen ranking (default: rating, descending).
     
     Args:
         latitude: Latitude of the search center.
         longitude: Longitude of the search center.
         radius: Search radius in meters (default 1000, ignored if rankby="distance").
-        keyword: Type of place to search for (default "hotel").
-        type: Optional specific place type (e.g., "lodging", "restaurant", "cafe").
+        keyword: Type of place to search for (default "hotel"). Pass a list (e.g. ["hotel", "hostel", "guesthouse"])
+                 to search several keywords at once; results are merged and deduplicated.
+        type: Optional specific place type (e.g., "lodging", "restaurant", "cafe"), or a list of types.
         min_price: Optional minimum price level (0-4, where 0=free, 4=very expensive).
         max_price: Optional maximum price level (0-4, where 0=free, 4=very expensive).
         language: Optional language code for results (e.g., "es", "en", "fr").
         rankby: Optional ranking method: "distance" or "prominence" (if "distance", radius is ignored).
         name: Optional exact name of the place to search for.
+        ranking: How to order results: "rating" (default), "bayesian" (rating weighted by number of reviews),
+                 "distance" (closest first), "price" (best fit for min_price/max_price), "open_now" (open places first)
+                 or "balanced" (mix of all of the above).
+        reach_from: Optional target (address, place name or "lat,lng"), e.g. the venue. With max_travel_minutes,
+                    only places from which it can be reached in time are returned, fastest first.
+        reach_mode: Travel mode for reach_from: "walking" (default), "bicycling", "driving" or "transit".
+        max_travel_minutes: Maximum travel time to reach_from, in minutes.
     """
-    logger.info(f"search_nearby called: lat={latitude}, lng={longitude}, radius={radius}, keyword={keyword}, type={type}, min_price={min_price}, max_price={max_price}, language={language}, rankby={rankby}, name={name}")
-    
-    results = get_nearby_places(
-        latitude=latitude,
-        longitude=longitude,
-        radius=radius,
-        keyword=keyword,
-        type=type,
-        min_price=min_price,
-        max_price=max_price,
-        language=language,
-        rankby=rankby,
-        name=name
-    )
+    logger.info(f"search_nearby called: lat={latitude}, lng={longitude}, radius={radius}, keyword={keyword}, type={type}, min_price={min_price}, max_price={max_price}, language={language}, rankby={rankby}, name={name}, ranking={ranking}, reach_from={reach_from}, reach_mode={reach_mode}, max_travel_minutes={max_travel_minutes}")
+    keywords = keyword if isinstance(keyword, list) else [keyword]
+    types = type if isinstance(type, list) else [type]
+    if max_travel_minutes is not None:
+        if max_travel_minutes <= 0:
+            return "max_travel_minutes must be greater than 0."
+        if not reach_from:
+            return "max_travel_minutes requires reach_from (the address or \"lat,lng\" to reach)."
+    
+    try:
+        results = await get_nearby_places_multi(
+            latitude=latitude,
+            longitude=longitude,
+            radius=radius,
+            keywords=keywords,
+            types=types,
+            min_price=min_price,
+            max_price=max_price,
+            language=language,
+            rankby=rankby,
+            name=name,
+            ranking=ranking,
+            limit=MAX_REACH_CANDIDATES if max_travel_minutes is not None else None
+        )
+    except ValueError as e:
+        return str(e)
+    
+    travel = None
+    if max_travel_minutes is not None and results:
+        try:
+            reachable = await filter_reachable(results, reach_from, reach_mode, max_travel_minutes)
+        except ValueError as e:
+            return str(e)
+        reachable = reachable[:MAX_REACH_RESULTS]
+        results = [place for place, _ in reachable]
+        travel = [f"{element['duration']} ({element['distance']}) by {reach_mode.lower()}" for _, element in reachable]
+        if not results:
+            return f"No places found within {max_travel_minutes} min of '{reach_from}' by {reach_mode.lower()}."
     
     # Format results as a readable string
     if not results:
-        search_term = keyword or type or "places"
+        search_term = " / ".join(k for k in keywords + types if k) or "places"
         return f"No {search_term} found near ({latitude}, {longitude})."
     
-    formatted_results = [f"Found {len(results)} places (showing top 5 by rating):\n"]
-    for idx, place in enumerate(results, 1):
-        name = place.get("name", "Unknown")
-        vicinity = place.get("vicinity", place.get("formatted_address", "No address"))
-        rating = place.get("rating", "N/A")
-        user_ratings_total = place.get("user_ratings_total")
-        place_id = place.get("place_id", "")
-        business_status = place.get("business_status", "")
-        photo_url = place.get("photo_url", "")
-        maps_url = place.get("maps_url", "")
-        
-        # Format ratings
-        ratings_str = f"Rating: {rating}"
-        if user_ratings_total:
-            ratings_str += f" ({user_ratings_total} reviews)"
-        
-        # Format business status
-        status_str = ""
-        if business_status:
-            status_str = f" | Status: {business_status}"
-        
-        formatted_results.append(
-            f"{idx}. {name}\n"
-            f"   {ratings_str}{status_str}\n"
-            f"   Address: {vicinity}"
+    with child_span("format"):
+        if travel:
+            header = f"Found {len(results)} places within {max_travel_minutes} min of '{reach_from}' by {reach_mode.lower()} (fastest first):"
+        else:
+            header = f"Found {len(results)} places (showing top results by {ranking}):"
+        formatted = format_places(results, header, travel)
+        return f"{formatted}\n\n{result_set_footer(results)}"
+
+@mcp.tool()
+@traced_tool
+@with_deadline
+@admission_controlled
+@profiled
+async def search_area(
+    keyword: Optional[str] = "hotel",
+    type: Optional[str] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    radius: Optional[int] = None,
+    south: Optional[float] = None,
+    west: Optional[float] = None,
+    north: Optional[float] = None,
+    east: Optional[float] = None,
+    tile_radius: int = 1500,
+    max_results: int = 20,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    language: Optional[str] = None,
+    ranking: str = "rating"
+) -> str:
+    """
+    Search a large area (a whole city or district) for places, e.g. to build a complete hotel inventory.
+    Use this instead of search_nearby when the area is larger than a few kilometers.
+    
+    Args:
+        keyword: Type of place to search for (default "hotel").
+        type: Optional specific place type (e.g., "lodging").
+        latitude, longitude, radius: Circle to cover (radius in meters, can exceed 50 km).
+        south, west, north, east: Alternatively, a bounding box to cover.
+        tile_radius: Radius in meters of each small search (default 1500). Tiles that return a full page are split automatically.
+        max_results: Maximum number of places to return (default 20, max 60).
+        min_price: Optional minimum price level (0-4).
+        max_price: Optional maximum price level (0-4).
+        language: Optional language code for results (e.g., "es", "en", "fr").
+        ranking: How to order results (same options as search_nearby).
+    """
+    logger.info(f"search_area called: center=({latitude}, {longitude}) radius={radius} bbox=({south}, {west}, {north}, {east}) keyword={keyword} type={type} tile_radius={tile_radius}")
+    try:
+        results, total, tile_count, truncated = await sweep_area(
+            keyword=keyword,
+            type=type,
+            latitude=latitude,
+            longitude=longitude,
+            radius=radius,
+            south=south,
+            west=west,
+            north=north,
+            east=east,
+            tile_radius=tile_radius,
+            max_results=min(max(max_results, 1), MAX_AREA_RESULTS),
+            min_price=min_price,
+            max_price=max_price,
+            language=language,
+            ranking=ranking
         )
-        if maps_url:
-            formatted_results.append(f"   View on Google Maps: {maps_url}")
-        if photo_url:
-            formatted_results.append(f"   Photo: {photo_url}")
-        if place_id:
-            formatted_results.append(f"   Place ID: {place_id}")
-        formatted_results.append("")  # Empty line between places
-        
-    return "\n".join(formatted_results).strip()
+    except ValueError as e:
+        return str(e)
+    
+    if not results:
+        return f"No {keyword or type or 'places'} found in the requested area ({tile_count} tiles searched)."
+    
+    with child_span("format"):
+        formatted = format_places(
+            results,
+            f"Found {total} places across {tile_count} search tiles (showing top {len(results)} by {ranking}):"
+        )
+        if truncated:
+            formatted += (
+                f"\n\nNote: {truncated} tiles hit the 20-result limit of a single search, so some places may be missing. "
+                "Search a smaller area to get them all."
+            )
+        return f"{formatted}\n\n{result_set_footer(results)}"
 
 logger.info("Tool 'search_nearby' registered successfully")
 
@@ -0,0 +1,150 @@
+import asyncio
+import functools
+import logging
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Tuple
+
+from tools.tracing import child_span
+
+logger = logging.getLogger(__name__)
+
+# Defaults for every tool; TOOL_LIMITS overrides single tools, e.g. "search_area=2:4,get_weather=16:64"
+TOOL_MAX_CONCURRENCY = int(os.environ.get("TOOL_MAX_CONCURRENCY", "8"))
+TOOL_MAX_QUEUE = int(os.environ.get("TOOL_MAX_QUEUE", "32"))
+TOOL_QUEUE_TIMEOUT = float(os.environ.get("TOOL_QUEUE_TIMEOUT", "15"))
+# Area sweeps fan out to many upstream calls each, so fewer of them run at once
+DEFAULT_TOOL_LIMITS = {"search_area": (2, 8)}
+
+def _parse_limits(spec: str) -> Dict[str, Tuple[int, int]]:
+    limits = dict(DEFAULT_TOOL_LIMITS)
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        try:
+            name, values = item.split("=")
+            concurrency, queue = values.split(":")
+            limits[name.strip()] = (int(concurrency), int(queue))
+        except ValueError:
+            logger.warning(f"Ignoring malformed TOOL_LIMITS entry '{item}' (expected name=concurrency:queue)")
+    return limits
+
+TOOL_LIMITS = _parse_limits(os.environ.get("TOOL_LIMITS", ""))
+
+class ServerBusyError(RuntimeError):
+    """Raised when a tool's wait queue is full or a queued call waited too long."""
+
+class AdmissionController:
+    """
+    Bounds how many calls of one tool run at once. Up to max_queue further calls wait
+    (at most queue_timeout seconds); beyond that calls are rejected immediately so admitted
+    requests keep a stable latency under overload.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.max_wait_ms = 0.0
+        # Time every caller spent before getting a slot or a "server busy" answer (including
+        # rejected, timed-out and cancelled waits), and the same for admitted calls only
+        self._recent_waits: Deque[float] = deque(maxlen=512)
+        self._admitted_waits: Deque[float] = deque(maxlen=512)
+
+    def _record_wait(self, wait_ms: float) -> None:
+        self._recent_waits.append(wait_ms)
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the tool's execution slots for the duration of the block."""
+        if not self._semaphore.locked():
+            # Free slot: acquire() returns without suspending
+            await self._semaphore.acquire()
+            wait_ms = 0.0
+        else:
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                self._record_wait(0.0)
+                raise ServerBusyError(f"Server busy: too many {self.name} requests in progress. Retry in a few seconds.")
+            with child_span("admission", tool=self.name, waiting=self.waiting) as span:
+                self.waiting += 1
+                started = time.perf_counter()
+                acquired = False
+                try:
+                    await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+                    acquired = True
+                except asyncio.TimeoutError:
+                    self.timed_out += 1
+                    raise ServerBusyError(f"Server busy: {self.name} request waited too long in the queue. Retry in a few seconds.")
+                finally:
+                    self.waiting -= 1
+                    wait_ms = (time.perf_counter() - started) * 1000
+                    span.set("queue_ms", round(wait_ms, 3))
+                    if not acquired:
+                        self._record_wait(wait_ms)
+
+        self._record_wait(wait_ms)
+        self._admitted_waits.append(wait_ms)
+        self.admitted += 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        def percentile(values: Deque[float], p: float) -> float:
+            ordered = sorted(values)
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 3) if ordered else 0.0
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "queue_ms_p50": percentile(self._recent_waits, 0.5),
+            "queue_ms_p95": percentile(self._recent_waits, 0.95),
+            "queue_ms_max": round(self.max_wait_ms, 3),
+            "admitted_queue_ms_p50": percentile(self._admitted_waits, 0.5),
+            "admitted_queue_ms_p95": percentile(self._admitted_waits, 0.95),
+        }
+
+controllers: Dict[str, AdmissionController] = {}
+
+def controller_for(name: str) -> AdmissionController:
+    if name not in controllers:
+        concurrency, queue = TOOL_LIMITS.get(name, (TOOL_MAX_CONCURRENCY, TOOL_MAX_QUEUE))
+        controllers[name] = AdmissionController(name, concurrency, queue, TOOL_QUEUE_TIMEOUT)
+    return controllers[name]
+
+def admission_controlled(func: Callable) -> Callable:
+    """
+    Decorator for async MCP tool functions: runs each call inside the tool's admission
+    controller and returns a "server busy" message instead of queueing without bound.
+    Place it below @traced_tool so queue time shows up in the trace.
+    """
+    controller = controller_for(func.__name__)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            async with controller.slot():
+                return await func(*args, **kwargs)
+        except ServerBusyError as e:
+            logger.warning(str(e))
+            return str(e)
+    return wrapper
+
+def admission_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: controller.stats() for name, controller in controllers.items()}
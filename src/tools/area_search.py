@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import math
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools import providers
+from tools.geo import haversine_m
+from tools.google_nearby import build_nearby_params, fetch_nearby, merge_places, get_mock_places
+from tools.places import Place
+from tools.ranking import rank_places, RANKING_STRATEGIES
+
+logger = logging.getLogger(__name__)
+
+METERS_PER_DEGREE_LAT = 111320.0
+AREA_MAX_CONCURRENCY = int(os.environ.get("AREA_MAX_CONCURRENCY", "8"))
+MAX_AREA_TILES = int(os.environ.get("MAX_AREA_TILES", "200"))
+# Nearby Search returns at most 20 places per page; a full page means the tile may hold more
+NEARBY_PAGE_SIZE = 20
+MIN_TILE_RADIUS = 100
+
+def hex_tiles(
+    south: float,
+    west: float,
+    north: float,
+    east: float,
+    tile_radius: float
+) -> List[Tuple[float, float]]:
+    """
+    Centers of circles of radius tile_radius (meters) covering the bounding box with a hexagonal tiling.
+
+    The lattice depends only on position, not on the box: rows are anchored at the equator and
+    each whole degree of latitude has its own fixed column spacing. Overlapping areas therefore
+    produce the same tile centers and hit the same nearby cache entries.
+    """
+    tiles: Dict[Tuple[float, float], None] = {}
+    # Cover the part of the box inside each one-degree band with that band's lattice
+    for band in range(math.floor(south), max(math.ceil(north), math.floor(south) + 1)):
+        lo, hi = max(south, band), min(north, band + 1)
+        for tile in _band_tiles(lo, west, hi, east, tile_radius, min(abs(band), abs(band + 1))):
+            tiles.setdefault(tile)
+    return list(tiles)
+
+def _band_tiles(
+    south: float,
+    west: float,
+    north: float,
+    east: float,
+    tile_radius: float,
+    ref_lat: float
+) -> List[Tuple[float, float]]:
+    # Row spacing 1.5r and column spacing sqrt(3)r with odd rows shifted by half a column
+    # is the tightest circle packing that leaves no gaps. Columns are spaced for ref_lat, the
+    # band's equator-most latitude, so they are never further apart than sqrt(3)r in the band.
+    dy = 1.5 * tile_radius / METERS_PER_DEGREE_LAT
+    dx = math.sqrt(3) * tile_radius / (METERS_PER_DEGREE_LAT * math.cos(math.radians(ref_lat)))
+
+    tiles = []
+    for row in range(math.floor(south / dy) - 1, math.ceil(north / dy) + 2):
+        lat = row * dy
+        offset = dx / 2 if row % 2 else 0.0
+        for col in range(math.floor((west - offset) / dx) - 1, math.ceil((east - offset) / dx) + 2):
+            lng = col * dx + offset
+            # Keep only circles that reach into the box
+            nearest_lat = min(max(lat, south), north)
+            nearest_lng = min(max(lng, west), east)
+            if haversine_m(lat, lng, nearest_lat, nearest_lng) <= tile_radius:
+                tiles.append((round(lat, 6), round(lng, 6)))
+    return tiles
+
+def circle_tiles(latitude: float, longitude: float, radius: float, tile_radius: float) -> List[Tuple[float, float]]:
+    """Tile centers covering a circle of radius meters around (latitude, longitude)."""
+    d_lat = radius / METERS_PER_DEGREE_LAT
+    d_lng = radius / (METERS_PER_DEGREE_LAT * max(math.cos(math.radians(latitude)), 1e-6))
+    return [
+        (lat, lng)
+        for lat, lng in hex_tiles(latitude - d_lat, longitude - d_lng, latitude + d_lat, longitude + d_lng, tile_radius)
+        if haversine_m(latitude, longitude, lat, lng) <= radius + tile_radius
+    ]
+
+def _inside(place: Place, area: Dict[str, Any]) -> bool:
+    if place.lat is None or place.lng is None:
+        return False
+    if "radius" in area:
+        return haversine_m(area["latitude"], area["longitude"], place.lat, place.lng) <= area["radius"]
+    return area["south"] <= place.lat <= area["north"] and area["west"] <= place.lng <= area["east"]
+
+def _reaches(area: Dict[str, Any], lat: float, lng: float, tile_radius: float) -> bool:
+    """Whether a tile circle overlaps the area."""
+    if "radius" in area:
+        return haversine_m(area["latitude"], area["longitude"], lat, lng) <= area["radius"] + tile_radius
+    nearest_lat = min(max(lat, area["south"]), area["north"])
+    nearest_lng = min(max(lng, area["west"]), area["east"])
+    return haversine_m(lat, lng, nearest_lat, nearest_lng) <= tile_radius
+
+async def search_area(
+    keyword: Optional[str] = "hotel",
+    type: Optional[str] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    radius: Optional[float] = None,
+    south: Optional[float] = None,
+    west: Optional[float] = None,
+    north: Optional[float] = None,
+    east: Optional[float] = None,
+    tile_radius: float = 1500,
+    max_results: int = 20,
+    api_key: Optional[str] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    language: Optional[str] = None,
+    ranking: str = "rating"
+) -> Tuple[List[Place], int, int, int]:
+    """
+    Sweep a large area with many small Nearby Searches.
+
+    The area is either a circle (latitude, longitude, radius in meters) or a bounding box
+    (south, west, north, east). It is covered with a hexagonal tiling of circles of
+    tile_radius meters; tiles are searched concurrently (AREA_MAX_CONCURRENCY at a time)
+    through the nearby cache, merged by place_id, filtered to the area and ranked.
+
+    A Nearby Search returns at most one page of 20 places, so a tile that comes back full
+    is searched again as tiles of half the radius, down to MIN_TILE_RADIUS and within
+    MAX_AREA_TILES searches in total. Tiles still full after that are reported as truncated.
+
+    Returns:
+        (places, total_found, tile_count, truncated_tiles): up to max_results ranked places,
+        the number of distinct places found in the area, the number of tiles searched and the
+        number of tiles whose results may be incomplete.
+    """
+    if ranking not in RANKING_STRATEGIES:
+        raise ValueError(f"ranking must be one of: {', '.join(RANKING_STRATEGIES)}")
+    if tile_radius < MIN_TILE_RADIUS or tile_radius > 50000:
+        raise ValueError(f"tile_radius must be between {MIN_TILE_RADIUS} and 50000 meters")
+
+    if None not in (latitude, longitude, radius):
+        area = {"latitude": latitude, "longitude": longitude, "radius": radius}
+        tiles = circle_tiles(latitude, longitude, radius, tile_radius)
+        center = (latitude, longitude)
+    elif None not in (south, west, north, east):
+        if south >= north or west >= east:
+            raise ValueError("Bounding box must satisfy south < north and west < east")
+        area = {"south": south, "west": west, "north": north, "east": east}
+        tiles = hex_tiles(south, west, north, east, tile_radius)
+        center = ((south + north) / 2, (west + east) / 2)
+    else:
+        raise ValueError("Provide either latitude/longitude/radius or south/west/north/east")
+
+    if len(tiles) > MAX_AREA_TILES:
+        raise ValueError(
+            f"Area needs {len(tiles)} tiles of {tile_radius} m (maximum {MAX_AREA_TILES}). "
+            "Use a larger tile_radius or a smaller area."
+        )
+
+    # Check for Mocking
+    if providers.places.mocked:
+        candidates = get_mock_places(*center)
+        return rank_places(candidates, max_results, ranking, latitude=center[0], longitude=center[1]), len(candidates), len(tiles), 0
+
+    semaphore = asyncio.Semaphore(max(1, AREA_MAX_CONCURRENCY))
+
+    async def run(lat: float, lng: float, radius_m: float) -> List[Place]:
+        params = build_nearby_params(
+            lat, lng, radius=int(radius_m), keyword=keyword, type=type,
+            min_price=min_price, max_price=max_price, language=language
+        )
+        async with semaphore:
+            return await asyncio.to_thread(fetch_nearby, params, api_key)
+
+    found: List[List[Place]] = []
+    failures: List[Exception] = []
+    searched = 0
+    truncated = 0
+    level_radius = float(tile_radius)
+    while tiles:
+        searched += len(tiles)
+        results = await asyncio.gather(*(run(lat, lng, level_radius) for lat, lng in tiles), return_exceptions=True)
+        saturated = []
+        for tile, result in zip(tiles, results):
+            if isinstance(result, Exception):
+                failures.append(result)
+                continue
+            found.append(result)
+            if len(result) >= NEARBY_PAGE_SIZE:
+                saturated.append(tile)
+
+        # Re-search full tiles as smaller tiles (on the global lattice, so they are cached too)
+        tiles = []
+        child_radius = level_radius / 2
+        if saturated and child_radius >= MIN_TILE_RADIUS:
+            children = dict.fromkeys(
+                child
+                for lat, lng in saturated
+                for child in circle_tiles(lat, lng, level_radius, child_radius)
+                if _reaches(area, child[0], child[1], child_radius)
+            )
+            if searched + len(children) <= MAX_AREA_TILES:
+                tiles = list(children)
+                level_radius = child_radius
+        if not tiles:
+            truncated = len(saturated)
+
+    if failures and not found:
+        raise failures[0]
+    if failures:
+        logger.warning(f"Area search: {len(failures)} of {searched} tiles failed, first error: {failures[0]}")
+    if truncated:
+        logger.info(f"Area search: {truncated} tiles returned a full page and could not be split further")
+
+    candidates = [
+        place
+        for place in merge_places(found)
+        if _inside(place, area)
+    ]
+    ranked = rank_places(
+        candidates, max_results, ranking,
+        latitude=center[0], longitude=center[1], radius=int(radius or tile_radius),
+        min_price=min_price, max_price=max_price
+    )
+    logger.info(f"Area search: {searched} tiles, {len(candidates)} distinct places, returning {len(ranked)}")
+    return ranked, len(candidates), searched, truncated
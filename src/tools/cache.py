@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from tools.tracing import child_span
+
+# Every TTLCache registers itself here by name (used by cache snapshots)
+registry: Dict[str, "TTLCache"] = {}
+
+class TTLCache:
+    """
+    Small in-memory cache with per-entry expiry.
+
+    Entries keep the same shape the weather cache has always used
+    ({"data": ..., "timestamp": ...}) plus the TTL they were stored with,
+    so stale entries can still be served as a fallback when an upstream fails.
+    Writes are locked: tools fill caches from asyncio.to_thread workers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        max_entries: Optional[int] = None,
+        persist: bool = True,
+        encode: Optional[Callable[[Any], Any]] = None,
+        decode: Optional[Callable[[Any], Any]] = None
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Whether entries are worth writing to cache snapshots
+        self.persist = persist
+        # Convert entry data to/from JSON-compatible values for snapshots (e.g. Place records)
+        self.encode = encode
+        self.decode = decode
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        registry[name] = self
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached data if present and fresh, otherwise None."""
+        with child_span(f"cache.{self.name}") as span:
+            entry = self._entries.get(key)
+            if entry is None:
+                span.set("status", "miss")
+                return None
+            if time.time() - entry["timestamp"] >= entry["ttl"]:
+                span.set("status", "expired")
+                return None
+            span.set("status", "hit")
+            return entry["data"]
+
+    def get_stale(self, key: str) -> Optional[Any]:
+        """Return the cached data regardless of age (used as an upstream fallback)."""
+        entry = self._entries.get(key)
+        return entry["data"] if entry is not None else None
+
+    def set(self, key: str, data: Any, ttl: Optional[float] = None) -> None:
+        """Store data under key, optionally with a TTL different from the default."""
+        entry = {
+            "data": data,
+            "timestamp": time.time(),
+            "ttl": self.ttl if ttl is None else ttl,
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if self.max_entries is not None:
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def restore(self, key: str, entry: Dict[str, Any]) -> bool:
+        """Insert a raw entry (with its original timestamp/ttl) unless the key already has newer data."""
+        with self._lock:
+            if key in self._entries:
+                return False
+            self._entries[key] = entry
+            if self.max_entries is not None and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def expires_in(self, key: str) -> Optional[float]:
+        """Seconds until the entry expires (negative if already expired), or None if absent."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return entry["timestamp"] + entry["ttl"] - time.time()
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            return iter(list(self._entries.items()))
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
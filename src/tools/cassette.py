@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from tools import speedups
+
+logger = logging.getLogger(__name__)
+
+# "record": call the real upstream and save request/response/latency to cassette files
+# "replay": serve saved responses (with their original latency) without touching the network
+# "off": plain upstream calls (default)
+CASSETTE_MODE = os.environ.get("CASSETTE_MODE", "off").lower()
+CASSETTE_DIR = os.environ.get("CASSETTE_DIR", "cassettes")
+# Replay latency multiplier (0 serves instantly, 1 reproduces the recorded timings)
+CASSETTE_LATENCY_SCALE = float(os.environ.get("CASSETTE_LATENCY_SCALE", "1.0"))
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when no recording exists for a request."""
+
+def recording() -> bool:
+    return CASSETTE_MODE == "record"
+
+def replaying() -> bool:
+    return CASSETTE_MODE == "replay"
+
+def _path(service: str, request: Dict[str, Any]) -> str:
+    # Requests must never contain API keys: callers pass the upstream parameters without them.
+    # The key always uses stdlib json so recordings stay addressable with or without FAST_MODE.
+    digest = hashlib.sha1(json.dumps(request, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return os.path.join(CASSETTE_DIR, service, f"{digest}.json")
+
+def _load(service: str, request: Dict[str, Any]) -> Dict[str, Any]:
+    path = _path(service, request)
+    try:
+        with open(path, "rb") as f:
+            return speedups.loads(f.read())
+    except FileNotFoundError:
+        raise CassetteMissError(f"No {service} recording for request {request}")
+
+def _save(service: str, request: Dict[str, Any], response: Any, elapsed: float) -> None:
+    path = _path(service, request)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(speedups.dumpb({
+            "service": service,
+            "request": request,
+            "response": response,
+            "elapsed": elapsed,
+            "recorded_at": time.time(),
+        }))
+    os.replace(tmp_path, path)
+
+def replay(service: str, request: Dict[str, Any]) -> Any:
+    """Saved response for a request, served instantly whatever CASSETTE_MODE is (raises CassetteMissError)."""
+    return _load(service, request)["response"]
+
+def call(service: str, request: Dict[str, Any], fetch: Callable[[], Any]) -> Any:
+    """
+    Run a blocking upstream call through the cassette layer.
+
+    Args:
+        service: Upstream name, used as the cassette sub-directory (e.g. "google.geocode").
+        request: The upstream request parameters (without API keys), used as the cassette key.
+        fetch: Zero-argument function performing the real call and returning a JSON-serializable response.
+    """
+    if replaying():
+        entry = _load(service, request)
+        time.sleep(entry["elapsed"] * CASSETTE_LATENCY_SCALE)
+        return entry["response"]
+    if not recording():
+        return fetch()
+    started = time.perf_counter()
+    response = fetch()
+    elapsed = time.perf_counter() - started
+    try:
+        _save(service, request, response, elapsed)
+    except OSError as e:
+        logger.warning(f"Could not write {service} cassette: {e}")
+    return response
+
+async def acall(service: str, request: Dict[str, Any], fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """Async counterpart of call() for coroutine-based upstream clients (httpx)."""
+    if replaying():
+        entry = _load(service, request)
+        await asyncio.sleep(entry["elapsed"] * CASSETTE_LATENCY_SCALE)
+        return entry["response"]
+    if not recording():
+        return await fetch()
+    started = time.perf_counter()
+    response = await fetch()
+    elapsed = time.perf_counter() - started
+    try:
+        _save(service, request, response, elapsed)
+    except OSError as e:
+        logger.warning(f"Could not write {service} cassette: {e}")
+    return response
@@ -0,0 +1,97 @@
+import asyncio
+import functools
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Time budget of a tool call when the client does not send one, and the most a client may ask for
+TOOL_DEADLINE_SECONDS = float(os.environ.get("TOOL_DEADLINE_SECONDS", "30"))
+TOOL_MAX_DEADLINE_SECONDS = float(os.environ.get("TOOL_MAX_DEADLINE_SECONDS", "120"))
+# Timeout of a single upstream request (Google, meteoblue), further capped by the time left
+UPSTREAM_TIMEOUT = float(os.environ.get("UPSTREAM_TIMEOUT", "10"))
+
+class DeadlineExceeded(TimeoutError):
+    """Raised before upstream work when the tool call's deadline has passed or the call was cancelled."""
+
+class Deadline:
+    """Deadline of one tool call, shared with the worker threads and tasks it starts."""
+
+    __slots__ = ("seconds", "expires_at", "cancelled")
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        # Set when the call timed out or the client went away, so queued work is skipped
+        self.cancelled = False
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("current_deadline", default=None)
+
+def remaining() -> Optional[float]:
+    """Seconds left for the current tool call, or None outside a tool call (e.g. prefetching)."""
+    deadline = _current_deadline.get()
+    return None if deadline is None else deadline.remaining()
+
+def check() -> None:
+    """Raise DeadlineExceeded if the current tool call was cancelled or is out of time."""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return
+    if deadline.cancelled:
+        raise DeadlineExceeded("Tool call was cancelled")
+    if deadline.remaining() <= 0:
+        raise DeadlineExceeded(f"Tool call deadline of {deadline.seconds:g}s exceeded")
+
+def upstream_timeout(default: float = UPSTREAM_TIMEOUT) -> float:
+    """Timeout for the next upstream request: default, capped by the time left for the tool call."""
+    check()
+    left = remaining()
+    return default if left is None else min(default, left)
+
+def _client_deadline_seconds() -> Optional[float]:
+    """Budget requested by the client through the MCP request metadata ("_meta": {"timeout_ms": ...})."""
+    try:
+        from fastmcp.server.dependencies import get_context
+        meta = get_context().request_context.meta
+    except Exception:
+        # No active MCP request (direct calls, scripts)
+        return None
+    value = getattr(meta, "timeout_ms", None) if meta is not None else None
+    try:
+        return float(value) / 1000 if value is not None and float(value) > 0 else None
+    except (TypeError, ValueError):
+        return None
+
+def with_deadline(func: Callable) -> Callable:
+    """
+    Decorator for async MCP tool functions: runs each call under a deadline (client-supplied
+    timeout_ms or TOOL_DEADLINE_SECONDS) and returns a timeout message when it expires.
+    If the call is cancelled (client disconnected or sent a cancellation), the deadline is
+    marked cancelled so upstream requests still queued in worker threads are skipped.
+    Place it below @traced_tool and above @admission_controlled, so queue time counts.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        seconds = min(_client_deadline_seconds() or TOOL_DEADLINE_SECONDS, TOOL_MAX_DEADLINE_SECONDS)
+        deadline = Deadline(seconds)
+        token = _current_deadline.set(deadline)
+        try:
+            async with asyncio.timeout(seconds):
+                return await func(*args, **kwargs)
+        except TimeoutError:
+            deadline.cancelled = True
+            logger.warning(f"{func.__name__} exceeded its {seconds:g}s deadline")
+            return f"Request timed out after {seconds:g}s. Try a smaller request or retry later."
+        except asyncio.CancelledError:
+            deadline.cancelled = True
+            logger.info(f"{func.__name__} cancelled by the client")
+            raise
+        finally:
+            _current_deadline.reset(token)
+    return wrapper
@@ -1,70 +1,190 @@
 import os
-import googlemaps
+import logging
+import re
+import time
 import urllib.parse
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, List, Optional, Union
+
+from tools import providers
+from tools.cache import TTLCache
+from tools.fixtures import MOCK_DISTANCE
+
+logger = logging.getLogger(__name__)
+
+# Driving/transit durations depend on traffic and timetables, so those entries are bucketed
+# by departure-time window. Walking/bicycling routes barely change and are cached long-term.
+TRAFFIC_MODES = ("driving", "transit")
+DEPARTURE_BUCKET_SECONDS = int(os.environ.get("DISTANCE_BUCKET_SECONDS", "900"))
+STATIC_TTL = float(os.environ.get("DISTANCE_STATIC_TTL", str(7 * 24 * 3600)))
+NEGATIVE_TTL = float(os.environ.get("DISTANCE_NEGATIVE_TTL", "3600"))
+# Element statuses that are a stable answer for the pair, worth caching as negative entries
+NEGATIVE_STATUSES = ("NOT_FOUND", "ZERO_RESULTS")
+
+# Distance Matrix request limits: 25 origins or destinations, 100 elements
+MAX_MATRIX_SIDE = 25
+MAX_MATRIX_ELEMENTS = 100
+
+distance_cache = TTLCache("distance", ttl=DEPARTURE_BUCKET_SECONDS, max_entries=20000)
+
+_COORDS_RE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+
+def normalize_location(location: str) -> str:
+    """
+    Normalize an origin/destination for cache keys.
+    Coordinates are rounded to 5 decimals (~1 m), text is lower-cased with collapsed whitespace.
+    """
+    match = _COORDS_RE.match(location)
+    if match:
+        return f"{float(match.group(1)):.5f},{float(match.group(2)):.5f}"
+    return " ".join(location.lower().split())
+
+def distance_cache_key(origin: str, destination: str, mode: str, departure_time: Optional[int] = None) -> str:
+    """Build the cache key for a pair, including the departure bucket for traffic-dependent modes."""
+    key = f"{normalize_location(origin)}|{normalize_location(destination)}|{mode}"
+    if mode in TRAFFIC_MODES:
+        departure = departure_time if departure_time is not None else time.time()
+        key += f"|{int(departure // DEPARTURE_BUCKET_SECONDS)}"
+    return key
 
 def calculate_distance(
     origin: str,
     destination: str,
     mode: str = "driving",
-    api_key: Optional[str] = None
+    api_key: Optional[str] = None,
+    departure_time: Optional[int] = None
 ) -> str:
     """
     Calculate the distance and travel time between two points using Google Maps.
-    
+
     Args:
         origin: Starting point (address, place name, or "lat,lng").
         destination: End point (address, place name, or "lat,lng").
         mode: Travel mode ("driving", "walking", "bicycling", "transit").
         api_key: Optional API key.
-        
+        departure_time: Optional departure time as a Unix timestamp (driving/transit only).
+
     Returns:
         A readable string with distance and duration, or an error message.
     """
-    
+
     # Generate Google Maps Link (for both mock and real)
     safe_origin = urllib.parse.quote(origin)
     safe_dest = urllib.parse.quote(destination)
     map_link = f"https://www.google.com/maps/dir/?api=1&origin={safe_origin}&destination={safe_dest}&travelmode={mode}"
 
     # Check for Mocking
-    mock_env = os.environ.get("MOCK_GOOGLE_API", "false").lower()
-    if mock_env == "true":
+    if providers.routing.mocked:
         return (
             f"Mock Distance: 5.2 km (Time: 15 mins) via {mode} from '{origin}' to '{destination}'\n"
             f"Map Link: {map_link}"
         )
 
-    # Real API Call
-    key = api_key or os.environ.get("GOOGLE_API_KEY")
-    if not key:
-        raise ValueError("Google API Key is required. Set GOOGLE_API_KEY env var.")
-
-    try:
-        gmaps = googlemaps.Client(key=key)
-        
-        # Distance Matrix API call
-        result = gmaps.distance_matrix(
-            origins=[origin],
-            destinations=[destination],
-            mode=mode
+    mode = mode.lower()
+    element = distance_matrix([origin], [destination], mode, api_key, departure_time)[0][0]
+    if element.get("error"):
+        return f"Error from Google API: {element['status']}"
+
+    # Parse result
+    if element['status'] == 'OK':
+        return (
+            f"Distance: {element['distance']}, Duration: {element['duration']} (Mode: {mode})\n"
+            f"Map Link: {map_link}"
         )
-        
-        # Parse result
-        if result['status'] == 'OK':
-            element = result['rows'][0]['elements'][0]
-            if element['status'] == 'OK':
-                dist_text = element['distance']['text']
-                duration_text = element['duration']['text']
-                return (
-                    f"Distance: {dist_text}, Duration: {duration_text} (Mode: {mode})\n"
-                    f"Map Link: {map_link}"
-                )
-            else:
-                return f"Could not calculate distance: {element['status']}"
-        else:
-            return f"Error from Google API: {result['status']}"
-        
-    except Exception as e:
-        print(f"Error querying Google Distance Matrix API: {e}")
-        raise RuntimeError(f"Google Distance Matrix API failed: {e}")
\ No newline at end of file
+    else:
+        return f"Could not calculate distance: {element['status']}"
+
+def _cached_element(key: str) -> Optional[Dict[str, Any]]:
+    element = distance_cache.get(key)
+    if element is not None and element["status"] == "OK" and "duration_s" not in element:
+        # Cached before numeric values were stored (e.g. restored from an older snapshot)
+        return None
+    return element
+
+def distance_matrix(
+    origins: List[str],
+    destinations: List[str],
+    mode: str = "driving",
+    api_key: Optional[str] = None,
+    departure_time: Optional[int] = None
+) -> List[List[Dict[str, Any]]]:
+    """
+    Distance Matrix elements for every origin/destination pair, cached per pair.
+
+    Only pairs missing from the cache are requested, chunked so each upstream request
+    stays within the Distance Matrix limits (25 origins, 25 destinations, 100 elements).
+
+    Returns:
+        rows[i][j] for origins[i] -> destinations[j]: {"status", "distance", "duration",
+        "distance_m", "duration_s"} when OK, {"status"} otherwise. If the whole request
+        failed (quota, denied...), the element also has "error": True.
+    """
+    mode = mode.lower()
+    # Check for Mocking
+    if providers.routing.mocked:
+        mock = {
+            "status": "OK",
+            "distance": MOCK_DISTANCE["distance"]["text"],
+            "duration": MOCK_DISTANCE["duration"]["text"],
+            "distance_m": MOCK_DISTANCE["distance"]["value"],
+            "duration_s": MOCK_DISTANCE["duration"]["value"]
+        }
+        return [[dict(mock) for _ in destinations] for _ in origins]
+
+    keys = [[distance_cache_key(o, d, mode, departure_time) for d in destinations] for o in origins]
+    rows: List[List[Optional[Dict[str, Any]]]] = [[_cached_element(k) for k in row] for row in keys]
+
+    missing_origins = [i for i, row in enumerate(rows) if any(e is None for e in row)]
+    if not missing_origins:
+        return rows
+    missing_destinations = sorted({j for i in missing_origins for j, e in enumerate(rows[i]) if e is None})
+
+    ttl = None if mode in TRAFFIC_MODES else STATIC_TTL
+    for d_start in range(0, len(missing_destinations), MAX_MATRIX_SIDE):
+        columns = missing_destinations[d_start:d_start + MAX_MATRIX_SIDE]
+        chunk = max(1, min(MAX_MATRIX_SIDE, MAX_MATRIX_ELEMENTS // len(columns)))
+        for o_start in range(0, len(missing_origins), chunk):
+            batch = missing_origins[o_start:o_start + chunk]
+            if all(rows[i][j] is not None for i in batch for j in columns):
+                continue
+            try:
+                params = {
+                    "origins": [origins[i] for i in batch],
+                    "destinations": [destinations[j] for j in columns],
+                    "mode": mode
+                }
+                if departure_time is not None and mode in TRAFFIC_MODES:
+                    params["departure_time"] = departure_time
+
+                # Distance Matrix call through the provider chain, bounded by the time left for the tool call
+                result, provider = providers.routing.call("distance_matrix", params, api_key)
+
+            except Exception as e:
+                logger.warning(f"Error querying Google Distance Matrix API: {e}")
+                raise RuntimeError(f"Google Distance Matrix API failed: {e}")
+
+            for row_index, i in enumerate(batch):
+                for col_index, j in enumerate(columns):
+                    if rows[i][j] is not None:
+                        continue
+                    if result['status'] != 'OK':
+                        rows[i][j] = {"status": result['status'], "error": True}
+                        continue
+                    element = result['rows'][row_index]['elements'][col_index]
+                    if element['status'] == 'OK':
+                        element = {
+                            "status": "OK",
+                            "distance": element['distance']['text'],
+                            "duration": element['duration']['text'],
+                            "distance_m": element['distance']['value'],
+                            "duration_s": element['duration']['value']
+                        }
+                        if provider.cacheable:
+                            distance_cache.set(keys[i][j], element, ttl=ttl)
+                    elif element['status'] in NEGATIVE_STATUSES:
+                        element = {"status": element['status']}
+                        if provider.cacheable:
+                            distance_cache.set(keys[i][j], element, ttl=NEGATIVE_TTL)
+                    else:
+                        element = {"status": element['status']}
+                    rows[i][j] = element
+    return rows
@@ -0,0 +1,186 @@
+from typing import Any, Dict, List
+
+# Built-in data served by the "mock" provider (MOCK_GOOGLE_API / MOCK_WEATHER_API, or as last-resort fallback)
+
+MOCK_LOCATION = {"lat": 40.785091, "lng": -73.968285}
+
+MOCK_DISTANCE = {"distance": {"text": "5.2 km", "value": 5200}, "duration": {"text": "15 mins", "value": 900}}
+
+MOCK_WEATHER = {
+    "metadata": {"name": "Mock City"},
+    "data_1h": {
+        "time": [
+            "2023-10-27 12:00", "2023-10-27 13:00", "2023-10-27 14:00",
+            "2023-10-27 15:00", "2023-10-27 16:00", "2023-10-27 17:00"
+        ],
+        "temperature": [22.5, 23.0, 22.0, 21.0, 20.0, 19.0],
+        "windspeed": [15.0, 10.0, 45.0, 12.0, 10.0, 10.0],
+        "pictocode": [1, 2, 4, 12, 1, 1]
+    },
+    "data_day": {
+        "time": ["2023-10-27"],
+        "temperature_max": [25.0],
+        "temperature_min": [18.0]
+    }
+}
+
+def mock_nearby_results(latitude: float, longitude: float) -> List[Dict[str, Any]]:
+    """Nearby Search results (raw API format) for hardcoded places around the given point."""
+    return [
+        {
+            "place_id": "mock_place_1",
+            "name": "The Grand Mock Resort",
+            "vicinity": "456 Luxury Ave, Simulation Town",
+            "formatted_address": "456 Luxury Avenue, Simulation Town, ST 12345",
+            "rating": 5.0,
+            "user_ratings_total": 1250,
+            "price_level": 4,
+            "types": ["lodging", "resort", "establishment", "point_of_interest"],
+            "geometry": {
+                "location": {
+                    "lat": latitude - 0.001,
+                    "lng": longitude - 0.001
+                }
+            },
+            "opening_hours": {
+                "open_now": True,
+                "weekday_text": [
+                    "Monday: 9:00 AM – 11:00 PM",
+                    "Tuesday: 9:00 AM – 11:00 PM",
+                    "Wednesday: 9:00 AM – 11:00 PM",
+                    "Thursday: 9:00 AM – 11:00 PM",
+                    "Friday: 9:00 AM – 11:00 PM",
+                    "Saturday: 9:00 AM – 11:00 PM",
+                    "Sunday: 9:00 AM – 11:00 PM"
+                ]
+            },
+            "photos": [
+                {
+                    "photo_reference": "mock_photo_ref_1",
+                    "width": 800,
+                    "height": 600
+                }
+            ],
+            "photo_url": "https://maps.googleapis.com/maps/api/place/photo?maxwidth=400&photoreference=mock_photo_ref_1&key=mock_key",
+            "business_status": "OPERATIONAL"
+        },
+        {
+            "place_id": "mock_place_2",
+            "name": "Mock Hotel California",
+            "vicinity": "123 Mockingbird Lane, Mock City",
+            "formatted_address": "123 Mockingbird Lane, Mock City, MC 54321",
+            "rating": 4.5,
+            "user_ratings_total": 850,
+            "price_level": 3,
+            "types": ["lodging", "hotel", "establishment", "point_of_interest"],
+            "geometry": {
+                "location": {
+                    "lat": latitude + 0.001,
+                    "lng": longitude + 0.001
+                }
+            },
+            "opening_hours": {
+                "open_now": True,
+                "weekday_text": [
+                    "Monday: 8:00 AM – 10:00 PM",
+                    "Tuesday: 8:00 AM – 10:00 PM",
+                    "Wednesday: 8:00 AM – 10:00 PM",
+                    "Thursday: 8:00 AM – 10:00 PM",
+                    "Friday: 8:00 AM – 10:00 PM",
+                    "Saturday: 8:00 AM – 10:00 PM",
+                    "Sunday: 8:00 AM – 10:00 PM"
+                ]
+            },
+            "photos": [
+                {
+                    "photo_reference": "mock_photo_ref_2",
+                    "width": 800,
+                    "height": 600
+                }
+            ],
+            "photo_url": "https://maps.googleapis.com/maps/api/place/photo?maxwidth=400&photoreference=mock_photo_ref_2&key=mock_key",
+            "business_status": "OPERATIONAL"
+        },
+        {
+            "place_id": "mock_place_3",
+            "name": "Budget Mock Inn",
+            "vicinity": "789 Economy St, Test Town",
+            "formatted_address": "789 Economy Street, Test Town, TT 67890",
+            "rating": 4.2,
+            "user_ratings_total": 320,
+            "price_level": 2,
+            "types": ["lodging", "hotel", "establishment", "point_of_interest"],
+            "geometry": {
+                "location": {
+                    "lat": latitude + 0.002,
+                    "lng": longitude + 0.002
+                }
+            },
+            "opening_hours": {
+                "open_now": True,
+                "weekday_text": [
+                    "Monday: 7:00 AM – 9:00 PM",
+                    "Tuesday: 7:00 AM – 9:00 PM",
+                    "Wednesday: 7:00 AM – 9:00 PM",
+                    "Thursday: 7:00 AM – 9:00 PM",
+                    "Friday: 7:00 AM – 9:00 PM",
+                    "Saturday: 7:00 AM – 9:00 PM",
+                    "Sunday: 7:00 AM – 9:00 PM"
+                ]
+            },
+            "business_status": "OPERATIONAL"
+        },
+        {
+            "place_id": "mock_place_4",
+            "name": "Cozy Mock Lodge",
+            "vicinity": "321 Comfort Blvd, Demo City",
+            "formatted_address": "321 Comfort Boulevard, Demo City, DC 13579",
+            "rating": 4.0,
+            "user_ratings_total": 180,
+            "price_level": 2,
+            "types": ["lodging", "establishment", "point_of_interest"],
+            "geometry": {
+                "location": {
+                    "lat": latitude - 0.002,
+                    "lng": longitude - 0.002
+                }
+            },
+            "opening_hours": {
+                "open_now": False,
+                "weekday_text": [
+                    "Monday: 10:00 AM – 8:00 PM",
+                    "Tuesday: 10:00 AM – 8:00 PM",
+                    "Wednesday: 10:00 AM – 8:00 PM",
+                    "Thursday: 10:00 AM – 8:00 PM",
+                    "Friday: 10:00 AM – 8:00 PM",
+                    "Saturday: 10:00 AM – 8:00 PM",
+                    "Sunday: Closed"
+                ]
+            },
+            "business_status": "OPERATIONAL"
+        },
+        {
+            "place_id": "mock_place_5",
+            "name": "Basic Mock Hostel",
+            "vicinity": "555 Simple Rd, Sample Village",
+            "formatted_address": "555 Simple Road, Sample Village, SV 24680",
+            "rating": 3.8,
+            "user_ratings_total": 95,
+            "price_level": 1,
+            "types": ["lodging", "hostel", "establishment", "point_of_interest"],
+            "geometry": {
+                "location": {
+                    "lat": latitude + 0.003,
+                    "lng": longitude + 0.003
+                }
+            },
+            "business_status": "OPERATIONAL"
+        }
+    ]
+
+def mock_distance_matrix(origins: List[str], destinations: List[str]) -> Dict[str, Any]:
+    """Distance Matrix response (raw API format) with the same element for every pair."""
+    return {
+        "status": "OK",
+        "rows": [{"elements": [{"status": "OK", **MOCK_DISTANCE} for _ in destinations]} for _ in origins]
+    }
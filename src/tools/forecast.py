@@ -0,0 +1,112 @@
+import bisect
+import datetime
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    # Imported on first use (numpy adds noticeably to server startup)
+    import numpy as np
+
+AGGREGATIONS = ("hourly", "3h", "6h", "daily")
+MAX_HORIZON_HOURS = 168
+# An hour counts as rainy from this much precipitation (mm)
+RAIN_THRESHOLD_MM = 0.1
+
+def _series(d1h: Dict[str, Any], key: str, start: int, stop: int) -> "np.ndarray":
+    """Hourly values as floats (missing values and short series become NaN)."""
+    import numpy as np
+
+    values = d1h.get(key) or []
+    out = np.full(stop - start, np.nan)
+    chunk = np.asarray(values[start:stop], dtype=float)
+    out[:len(chunk)] = chunk
+    return out
+
+def current_hour_index(weather_data: Dict[str, Any]) -> int:
+    """
+    Index of the current local hour in data_1h (meteoblue series start at local midnight).
+    Falls back to 0 when the payload has no UTC offset (e.g. mock data).
+    """
+    offset = weather_data.get("metadata", {}).get("utc_timeoffset")
+    times = weather_data.get("data_1h", {}).get("time") or []
+    if offset is None or not times:
+        return 0
+    now = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=float(offset))
+    # "YYYY-MM-DD HH:MM" strings sort chronologically
+    index = bisect.bisect_right(times, now.strftime("%Y-%m-%d %H:%M")) - 1
+    return min(max(index, 0), len(times) - 1)
+
+def aggregate_hourly(
+    d1h: Dict[str, Any],
+    start: int,
+    horizon_hours: int,
+    aggregation: str
+) -> List[Dict[str, Any]]:
+    """
+    Aggregate the hourly series over [start, start + horizon_hours) into buckets.
+
+    Args:
+        d1h: meteoblue "data_1h" block (time, temperature, windspeed, pictocode, precipitation).
+        start: Index of the first hour.
+        horizon_hours: Number of hours to cover.
+        aggregation: "hourly", "3h", "6h" or "daily" (calendar days of the series' local time).
+
+    Returns:
+        One dict per bucket: label, offset (hours from start), temp_min/temp_max/temp_mean,
+        wind_max, pictocode (worst code in the bucket), precipitation (mm, summed) and
+        rain_hours (hours with at least RAIN_THRESHOLD_MM); precipitation fields are None
+        when the series has no precipitation.
+    """
+    if aggregation not in AGGREGATIONS:
+        raise ValueError(f"aggregation must be one of: {', '.join(AGGREGATIONS)}")
+    import numpy as np
+
+    times = list(d1h.get("time") or [])
+    stop = min(start + horizon_hours, len(times))
+    if stop <= start:
+        return []
+
+    temps = _series(d1h, "temperature", start, stop)
+    winds = _series(d1h, "windspeed", start, stop)
+    codes = _series(d1h, "pictocode", start, stop)
+    has_rain = bool(d1h.get("precipitation"))
+    rain = _series(d1h, "precipitation", start, stop)
+    labels = times[start:stop]
+
+    if aggregation == "daily":
+        days = np.array([str(t)[:10] for t in labels])
+        bounds = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    else:
+        step = {"hourly": 1, "3h": 3, "6h": 6}[aggregation]
+        bounds = np.arange(0, stop - start, step)
+
+    valid = ~np.isnan(temps)
+    counts = np.add.reduceat(valid.astype(int), bounds)
+    sums = np.add.reduceat(np.where(valid, temps, 0.0), bounds)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    # fmin/fmax ignore NaN unless the whole bucket is NaN
+    temp_min = np.fmin.reduceat(temps, bounds)
+    temp_max = np.fmax.reduceat(temps, bounds)
+    wind_max = np.fmax.reduceat(winds, bounds)
+    code_max = np.fmax.reduceat(codes, bounds)
+    rain_sum = np.add.reduceat(np.nan_to_num(rain), bounds)
+    rain_hours = np.add.reduceat((np.nan_to_num(rain) >= RAIN_THRESHOLD_MM).astype(int), bounds)
+
+    def value(x: float, digits: int = 1) -> Any:
+        return None if np.isnan(x) else round(float(x), digits)
+
+    buckets = []
+    for i, bound in enumerate(bounds):
+        label = str(labels[bound])
+        buckets.append({
+            "label": label[:10] if aggregation == "daily" else label,
+            "offset": int(bound),
+            "temp_min": value(temp_min[i]),
+            "temp_max": value(temp_max[i]),
+            "temp_mean": value(means[i]),
+            "wind_max": value(wind_max[i]),
+            "pictocode": None if np.isnan(code_max[i]) else int(code_max[i]),
+            "precipitation": value(rain_sum[i]) if has_rain else None,
+            "rain_hours": int(rain_hours[i]) if has_rain else None,
+        })
+    return buckets
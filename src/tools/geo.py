@@ -0,0 +1,18 @@
+import math
+from typing import Tuple
+
+EARTH_RADIUS_M = 6371000.0
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points, in meters."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+def parse_lat_lng(value: str) -> Tuple[float, float]:
+    """Parse a "lat,lng" string. Raises ValueError if it is not two comma-separated numbers."""
+    lat_str, lng_str = value.split(",")
+    return float(lat_str), float(lng_str)
@@ -1,6 +1,47 @@
 import os
-import googlemaps
-from typing import Dict, Any, Optional, Union
+import logging
+import time
+import asyncio
+import threading
+from typing import Dict, Any, List, Optional, Union
+
+from tools import providers
+from tools.cache import TTLCache
+from tools.fixtures import MOCK_LOCATION
+
+logger = logging.getLogger(__name__)
+
+# Addresses rarely move; "not found" answers are kept for a shorter time
+geocode_cache = TTLCache("geocode", ttl=float(os.environ.get("GEOCODE_CACHE_TTL", str(7 * 24 * 3600))), max_entries=20000)
+GEOCODE_NEGATIVE_TTL = float(os.environ.get("GEOCODE_NEGATIVE_TTL", "3600"))
+GEOCODE_MAX_CONCURRENCY = int(os.environ.get("GEOCODE_MAX_CONCURRENCY", "5"))
+GEOCODE_QPS = float(os.environ.get("GEOCODE_QPS", "10"))
+
+def normalize_address(address: str) -> str:
+    """Normalize an address for cache keys and deduplication (case and whitespace insensitive)."""
+    return " ".join(address.lower().split())
+
+class _RateLimiter:
+    """
+    Spaces out call start times so that at most `rate` calls start per second.
+    Thread-safe: geocode_address runs in asyncio.to_thread workers, so waiting is a blocking sleep.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+# One limiter per process, shared by every upstream geocode (single, batch and reachability lookups)
+geocode_limiter = _RateLimiter(GEOCODE_QPS)
 
 def geocode_address(
     address: str,
@@ -8,43 +49,86 @@ def geocode_address(
 ) -> Union[Dict[str, float], str]:
     """
     Convert an address or place name into geographic coordinates (latitude/longitude).
-    
+
     Args:
         address: The address or place name to geocode (e.g., "Eiffel Tower", "1600 Amphitheatre Parkway").
         api_key: Optional API key. If not provided, looks for GOOGLE_API_KEY env var.
-        
+
     Returns:
         A dictionary with 'lat' and 'lng' keys, or an error string if not found.
     """
-    
+
     # Check for Mocking
-    mock_env = os.environ.get("MOCK_GOOGLE_API", "false").lower()
-    if mock_env == "true":
+    if providers.geocoding.mocked:
         # Return a fixed mock location (e.g., roughly Central Park, NY)
-        return {"lat": 40.785091, "lng": -73.968285}
+        return dict(MOCK_LOCATION)
 
-    # Real API Call
-    key = api_key or os.environ.get("GOOGLE_API_KEY")
-    if not key:
-        raise ValueError("Google API Key is required. Set GOOGLE_API_KEY env var.")
+    cache_key = normalize_address(address)
+    cached = geocode_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
     try:
-        gmaps = googlemaps.Client(key=key)
-        
-        # Geocoding API call
-        results = gmaps.geocode(address)
-        
+        geocode_limiter.wait()
+        # Geocoding call through the provider chain, bounded by the time left for the tool call
+        results, provider = providers.geocoding.call("geocode", address, api_key)
+
         if not results:
-            return f"No coordinates found for address: '{address}'"
-            
+            message = f"No coordinates found for address: '{address}'"
+            if provider.cacheable:
+                geocode_cache.set(cache_key, message, ttl=GEOCODE_NEGATIVE_TTL)
+            return message
+
         # Extract location from the first result
         location = results[0].get('geometry', {}).get('location')
-        
+
         if location:
+            if provider.cacheable:
+                geocode_cache.set(cache_key, location)
             return location
         else:
             return f"Could not extract location data for: '{address}'"
-        
+
     except Exception as e:
-        print(f"Error querying Google Geocoding API: {e}")
+        logger.warning(f"Error querying Google Geocoding API: {e}")
         raise RuntimeError(f"Google Geocoding API failed: {e}")
+
+async def geocode_addresses(
+    addresses: List[str],
+    api_key: Optional[str] = None
+) -> List[Union[Dict[str, float], str]]:
+    """
+    Geocode several addresses at once.
+
+    Addresses are normalized and deduplicated, cache hits are answered directly and the
+    remaining ones are geocoded concurrently (GEOCODE_MAX_CONCURRENCY at a time, at most
+    GEOCODE_QPS requests per second across all geocode calls in the process).
+
+    Args:
+        addresses: Addresses or place names to geocode.
+        api_key: Optional API key. If not provided, looks for GOOGLE_API_KEY env var.
+
+    Returns:
+        One entry per input address, in input order: a dictionary with 'lat' and 'lng'
+        keys, or an error string for that address.
+    """
+    # First spelling of each normalized address is the one sent upstream
+    unique: Dict[str, str] = {}
+    for address in addresses:
+        unique.setdefault(normalize_address(address), address)
+
+    semaphore = asyncio.Semaphore(max(1, GEOCODE_MAX_CONCURRENCY))
+
+    async def resolve(address: str) -> Union[Dict[str, float], str]:
+        cached = geocode_cache.get(normalize_address(address))
+        if cached is not None:
+            return cached
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(geocode_address, address, api_key)
+            except Exception as e:
+                return f"Error geocoding '{address}': {e}"
+
+    results = await asyncio.gather(*(resolve(address) for address in unique.values()))
+    by_key = dict(zip(unique.keys(), results))
+    return [by_key[normalize_address(address)] for address in addresses]
@@ -1,7 +1,27 @@
 import os
-import googlemaps
+import json
+import asyncio
+import logging
 from typing import List, Dict, Any, Optional
 
+from tools import providers
+from tools.cache import TTLCache
+from tools.fixtures import mock_nearby_results
+from tools.places import Place, encode_places, decode_places
+from tools.prefetch import prefetcher
+from tools.ranking import rank_places, RANKING_STRATEGIES
+
+logger = logging.getLogger(__name__)
+
+# Nearby Search results as Place records, keyed by the request parameters.
+# Ranking and limiting happen after the cache so every caller shares the same entries.
+nearby_cache = TTLCache(
+    "nearby", ttl=float(os.environ.get("NEARBY_CACHE_TTL", "900")), max_entries=5000,
+    encode=encode_places, decode=decode_places
+)
+NEARBY_MAX_CONCURRENCY = int(os.environ.get("NEARBY_MAX_CONCURRENCY", "4"))
+MAX_NEARBY_FANOUT = int(os.environ.get("MAX_NEARBY_FANOUT", "6"))
+
 def get_photo_url(photo_reference: str, api_key: str, max_width: int = 400) -> str:
     """
     Generate a URL for a place photo using the photo_reference.
@@ -47,242 +67,157 @@ def get_google_maps_url(place_id: str = None, latitude: float = None, longitude:
             return f"https://www.google.com/maps/search/?api=1&query={encoded_name}"
         return ""
 
-def get_nearby_places(
+def to_place(result: Dict[str, Any]) -> Place:
+    """Convert a Nearby Search result into a Place, with its photo reference and Google Maps URL."""
+    photo_ref = ""
+    photos = result.get('photos', [])
+    if photos:
+        # Select the photo with the highest resolution (width * height)
+        # This ensures we get the best quality photo available
+        best_photo = max(photos, key=lambda p: p.get('width', 0) * p.get('height', 0))
+        photo_ref = best_photo.get('photo_reference') or ""
+
+    location = result.get('geometry', {}).get('location', {})
+    maps_url = get_google_maps_url(
+        place_id=result.get('place_id'),
+        latitude=location.get('lat'),
+        longitude=location.get('lng'),
+        name=result.get('name')
+    )
+    return Place.from_result(result, photo_reference=photo_ref, maps_url=maps_url)
+
+def place_photo_url(place: Place, api_key: Optional[str] = None) -> str:
+    """The keyed photo URL of a place ("" if it has no photo). Built on demand so cached places hold no API key."""
+    if not place.photo_reference:
+        return ""
+    key = api_key or providers.google_api_key or ("mock_key" if providers.places.mocked else "")
+    if not key:
+        return ""
+    return get_photo_url(place.photo_reference, key, max_width=400)
+
+async def get_nearby_places_multi(
     latitude: float,
     longitude: float,
     radius: int = 1000,
-    keyword: str = "hotel",
+    keywords: Optional[List[str]] = None,
+    types: Optional[List[str]] = None,
     api_key: Optional[str] = None,
-    type: Optional[str] = None,
     min_price: Optional[int] = None,
     max_price: Optional[int] = None,
     language: Optional[str] = None,
     rankby: Optional[str] = None,
-    name: Optional[str] = None
-) -> List[Dict[str, Any]]:
+    name: Optional[str] = None,
+    ranking: str = "rating",
+    limit: Optional[int] = None
+) -> List[Place]:
     """
-    Search for nearby places using Google Maps Nearby Search API.
+    Search for nearby places using Google Maps Nearby Search API, for several keywords
+    and/or place types around the same point in one go.
     
-    Returns a maximum of 5 places, sorted by rating (descending).
-    The API returns up to 20 results, but we limit to 5 to save credits and optimize processing.
+    One Nearby Search is issued per keyword/type combination (concurrently, at most
+    NEARBY_MAX_CONCURRENCY at a time), the results are merged and deduplicated by
+    place_id, and the union is ranked once.
     
     Args:
         latitude: Latitude of the location.
         longitude: Longitude of the location.
         radius: Search radius in meters (required if rankby is not "distance").
-        keyword: Keyword to search for (e.g., "hotel", "restaurant").
+        keywords: Keywords to search for (e.g. ["hotel", "hostel", "guesthouse"]).
+        types: Place types to search for (e.g. ["lodging"]).
         api_key: Optional API key. If not provided, looks for GOOGLE_API_KEY env var.
-        type: Optional specific place type (e.g., "lodging", "restaurant", "cafe").
         min_price: Optional minimum price level (0-4, where 0=free, 4=very expensive).
         max_price: Optional maximum price level (0-4, where 0=free, 4=very expensive).
         language: Optional language code for results (e.g., "es", "en", "fr").
-        rankby: Optional ranking method: "distance" or "prominence". 
+        rankby: Optional ranking method: "distance" or "prominence".
                 If "distance", radius parameter is ignored.
         name: Optional exact name of the place to search for.
+        ranking: How to order the merged results (see tools.ranking.RANKING_STRATEGIES).
+        limit: Number of places to return (default 3, or 5 with mock data).
         
     Returns:
-        List[Dict[str, Any]]: A list of up to 5 places, sorted by rating (descending).
-        Each dictionary contains place information with fields such as:
-        - name: str - Place name
-        - vicinity: str - Approximate address
-        - formatted_address: str - Full formatted address
-        - rating: float - Average rating (1.0-5.0)
-        - user_ratings_total: int - Total number of ratings
-        - price_level: int - Price level (0-4)
-        - place_id: str - Unique place identifier
-        - geometry.location.lat/lng: float - Coordinates
-        - types: List[str] - Place types/categories
-        - opening_hours: dict - Opening hours information (if available)
-        - photos: List[dict] - Photo references (if available)
-        - photo_url: str - Direct URL to the first photo (if available, generated from photo_reference)
-        - business_status: str - Business status (e.g., "OPERATIONAL")
-        And other optional fields depending on data availability.
+        List[Place]: The best places across all searches, best first according to `ranking`.
+        Each Place holds the fields the tools use:
+        - place_id, name, address (vicinity or formatted address)
+        - lat, lng: Coordinates
+        - rating (1.0-5.0), user_ratings_total, price_level (0-4)
+        - open_now: Opening status (if available)
+        - business_status: Business status (e.g., "OPERATIONAL")
+        - photo_reference: Reference of the highest resolution photo (see place_photo_url)
+        - maps_url: Google Maps URL of the place
     """
+    if ranking not in RANKING_STRATEGIES:
+        raise ValueError(f"ranking must be one of: {', '.join(RANKING_STRATEGIES)}")
+    
+    keywords = list(dict.fromkeys(k for k in (keywords or []) if k)) or [None]
+    types = list(dict.fromkeys(t for t in (types or []) if t)) or [None]
+    combinations = [(k, t) for k in keywords for t in types]
+    if len(combinations) > MAX_NEARBY_FANOUT:
+        raise ValueError(f"Too many keyword/type combinations ({len(combinations)}). Maximum is {MAX_NEARBY_FANOUT}.")
     
     # Check for Mocking
-    mock_env = os.environ.get("MOCK_GOOGLE_API", "false").lower()
-    if mock_env == "true":
-        mock_places = [
-            {
-                "place_id": "mock_place_1",
-                "name": "The Grand Mock Resort",
-                "vicinity": "456 Luxury Ave, Simulation Town",
-                "formatted_address": "456 Luxury Avenue, Simulation Town, ST 12345",
-                "rating": 5.0,
-                "user_ratings_total": 1250,
-                "price_level": 4,
-                "types": ["lodging", "resort", "establishment", "point_of_interest"],
-                "geometry": {
-                    "location": {
-                        "lat": latitude - 0.001,
-                        "lng": longitude - 0.001
-                    }
-                },
-                "opening_hours": {
-                    "open_now": True,
-                    "weekday_text": [
-                        "Monday: 9:00 AM – 11:00 PM",
-                        "Tuesday: 9:00 AM – 11:00 PM",
-                        "Wednesday: 9:00 AM – 11:00 PM",
-                        "Thursday: 9:00 AM – 11:00 PM",
-                        "Friday: 9:00 AM – 11:00 PM",
-                        "Saturday: 9:00 AM – 11:00 PM",
-                        "Sunday: 9:00 AM – 11:00 PM"
-                    ]
-                },
-                "photos": [
-                    {
-                        "photo_reference": "mock_photo_ref_1",
-                        "width": 800,
-                        "height": 600
-                    }
-                ],
-                "photo_url": "https://maps.googleapis.com/maps/api/place/photo?maxwidth=400&photoreference=mock_photo_ref_1&key=mock_key",
-                "business_status": "OPERATIONAL"
-            },
-            {
-                "place_id": "mock_place_2",
-                "name": "Mock Hotel California",
-                "vicinity": "123 Mockingbird Lane, Mock City",
-                "formatted_address": "123 Mockingbird Lane, Mock City, MC 54321",
-                "rating": 4.5,
-                "user_ratings_total": 850,
-                "price_level": 3,
-                "types": ["lodging", "hotel", "establishment", "point_of_interest"],
-                "geometry": {
-                    "location": {
-                        "lat": latitude + 0.001,
-                        "lng": longitude + 0.001
-                    }
-                },
-                "opening_hours": {
-                    "open_now": True,
-                    "weekday_text": [
-                        "Monday: 8:00 AM – 10:00 PM",
-                        "Tuesday: 8:00 AM – 10:00 PM",
-                        "Wednesday: 8:00 AM – 10:00 PM",
-                        "Thursday: 8:00 AM – 10:00 PM",
-                        "Friday: 8:00 AM – 10:00 PM",
-                        "Saturday: 8:00 AM – 10:00 PM",
-                        "Sunday: 8:00 AM – 10:00 PM"
-                    ]
-                },
-                "photos": [
-                    {
-                        "photo_reference": "mock_photo_ref_2",
-                        "width": 800,
-                        "height": 600
-                    }
-                ],
-                "photo_url": "https://maps.googleapis.com/maps/api/place/photo?maxwidth=400&photoreference=mock_photo_ref_2&key=mock_key",
-                "business_status": "OPERATIONAL"
-            },
-            {
-                "place_id": "mock_place_3",
-                "name": "Budget Mock Inn",
-                "vicinity": "789 Economy St, Test Town",
-                "formatted_address": "789 Economy Street, Test Town, TT 67890",
-                "rating": 4.2,
-                "user_ratings_total": 320,
-                "price_level": 2,
-                "types": ["lodging", "hotel", "establishment", "point_of_interest"],
-                "geometry": {
-                    "location": {
-                        "lat": latitude + 0.002,
-                        "lng": longitude + 0.002
-                    }
-                },
-                "opening_hours": {
-                    "open_now": True,
-                    "weekday_text": [
-                        "Monday: 7:00 AM – 9:00 PM",
-                        "Tuesday: 7:00 AM – 9:00 PM",
-                        "Wednesday: 7:00 AM – 9:00 PM",
-                        "Thursday: 7:00 AM – 9:00 PM",
-                        "Friday: 7:00 AM – 9:00 PM",
-                        "Saturday: 7:00 AM – 9:00 PM",
-                        "Sunday: 7:00 AM – 9:00 PM"
-                    ]
-                },
-                "business_status": "OPERATIONAL"
-            },
-            {
-                "place_id": "mock_place_4",
-                "name": "Cozy Mock Lodge",
-                "vicinity": "321 Comfort Blvd, Demo City",
-                "formatted_address": "321 Comfort Boulevard, Demo City, DC 13579",
-                "rating": 4.0,
-                "user_ratings_total": 180,
-                "price_level": 2,
-                "types": ["lodging", "establishment", "point_of_interest"],
-                "geometry": {
-                    "location": {
-                        "lat": latitude - 0.002,
-                        "lng": longitude - 0.002
-                    }
-                },
-                "opening_hours": {
-                    "open_now": False,
-                    "weekday_text": [
-                        "Monday: 10:00 AM – 8:00 PM",
-                        "Tuesday: 10:00 AM – 8:00 PM",
-                        "Wednesday: 10:00 AM – 8:00 PM",
-                        "Thursday: 10:00 AM – 8:00 PM",
-                        "Friday: 10:00 AM – 8:00 PM",
-                        "Saturday: 10:00 AM – 8:00 PM",
-                        "Sunday: Closed"
-                    ]
-                },
-                "business_status": "OPERATIONAL"
-            },
-            {
-                "place_id": "mock_place_5",
-                "name": "Basic Mock Hostel",
-                "vicinity": "555 Simple Rd, Sample Village",
-                "formatted_address": "555 Simple Road, Sample Village, SV 24680",
-                "rating": 3.8,
-                "user_ratings_total": 95,
-                "price_level": 1,
-                "types": ["lodging", "hostel", "establishment", "point_of_interest"],
-                "geometry": {
-                    "location": {
-                        "lat": latitude + 0.003,
-                        "lng": longitude + 0.003
-                    }
-                },
-                "business_status": "OPERATIONAL"
-            }
-        ]
-        
-        # Add photo URLs and Google Maps URLs to mock places
-        mock_key = os.environ.get("GOOGLE_API_KEY", "mock_key")
-        for place in mock_places:
-            photos = place.get('photos', [])
-            if photos and len(photos) > 0:
-                # Select the photo with the highest resolution (width * height)
-                best_photo = max(photos, key=lambda p: p.get('width', 0) * p.get('height', 0))
-                photo_ref = best_photo.get('photo_reference')
-                if photo_ref:
-                    place['photo_url'] = get_photo_url(photo_ref, mock_key, max_width=400)
-            
-            # Add Google Maps URL for mock places
-            place_id = place.get('place_id')
-            location = place.get('geometry', {}).get('location', {})
-            lat = location.get('lat')
-            lng = location.get('lng')
-            name = place.get('name')
-            
-            place['maps_url'] = get_google_maps_url(
-                place_id=place_id,
-                latitude=lat,
-                longitude=lng,
-                name=name
-            )
-        
-        # Sort by rating descending and limit to 5
-        sorted_mock = sorted(mock_places, key=lambda x: x.get('rating', 0), reverse=True)
-        return sorted_mock[:5]
+    if providers.places.mocked:
+        return rank_places(
+            get_mock_places(latitude, longitude), limit or 5, ranking,
+            latitude=latitude, longitude=longitude, radius=radius,
+            min_price=min_price, max_price=max_price
+        )
+    
+    param_sets = [
+        build_nearby_params(
+            latitude, longitude, radius=radius, keyword=k, type=t,
+            min_price=min_price, max_price=max_price, language=language, rankby=rankby, name=name
+        )
+        for k, t in combinations
+    ]
+    semaphore = asyncio.Semaphore(max(1, NEARBY_MAX_CONCURRENCY))
+    
+    async def run(params: Dict[str, Any]) -> List[Place]:
+        async with semaphore:
+            return await asyncio.to_thread(fetch_nearby, params, api_key)
+    
+    results = await asyncio.gather(*(run(params) for params in param_sets), return_exceptions=True)
+    failures = [r for r in results if isinstance(r, Exception)]
+    if len(failures) == len(results):
+        raise failures[0]
+    for failure in failures:
+        logger.warning(f"Nearby search failed for one keyword/type combination: {failure}")
+    
+    candidates = merge_places([r for r in results if not isinstance(r, Exception)])
+    limited_places = rank_places(
+        candidates, limit or 3, ranking,
+        latitude=latitude, longitude=longitude, radius=param_sets[0].get("radius"),
+        min_price=min_price, max_price=max_price
+    )
+    logger.info(f"Returning {len(limited_places)} places (limited from {len(candidates)} merged from {len(param_sets)} searches)")
+    return limited_places
+
+def merge_places(result_lists: List[List[Place]]) -> List[Place]:
+    """Concatenate several result lists, keeping only the first occurrence of each place_id."""
+    seen = set()
+    merged = []
+    for places in result_lists:
+        for place in places:
+            place_id = place.place_id
+            if place_id:
+                if place_id in seen:
+                    continue
+                seen.add(place_id)
+            merged.append(place)
+    return merged
 
+def build_nearby_params(
+    latitude: float,
+    longitude: float,
+    radius: Optional[int] = 1000,
+    keyword: Optional[str] = None,
+    type: Optional[str] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    language: Optional[str] = None,
+    rankby: Optional[str] = None,
+    name: Optional[str] = None
+) -> Dict[str, Any]:
+    """Validate search options and build the parameters for googlemaps.Client.places_nearby."""
     # Validate parameters
     if min_price is not None and (min_price < 0 or min_price > 4):
         raise ValueError("min_price must be between 0 and 4")
@@ -294,91 +229,98 @@ def get_nearby_places(
         # If rankby is distance, radius should not be used
         radius = None
 
-    # Real API Call
-    key = api_key or os.environ.get("GOOGLE_API_KEY")
-    if not key:
-        raise ValueError("Google API Key is required. Set GOOGLE_API_KEY env var or provide it.")
+    # Build parameters dynamically, only including non-None values
+    params = {
+        "location": (latitude, longitude),
+    }
+    
+    # Add radius only if rankby is not "distance"
+    if rankby != "distance" and radius is not None:
+        params["radius"] = radius
+    
+    if keyword:
+        params["keyword"] = keyword
+    
+    if type:
+        params["type"] = type
+    
+    if min_price is not None:
+        params["min_price"] = min_price
+    
+    if max_price is not None:
+        params["max_price"] = max_price
+    
+    if language:
+        params["language"] = language
+    
+    if rankby:
+        params["rankby"] = rankby
+    
+    if name:
+        params["name"] = name
 
-    try:
-        gmaps = googlemaps.Client(key=key)
-        
-        # Build parameters dynamically, only including non-None values
-        params = {
-            "location": (latitude, longitude),
-        }
-        
-        # Add radius only if rankby is not "distance"
-        if rankby != "distance" and radius is not None:
-            params["radius"] = radius
-        
-        if keyword:
-            params["keyword"] = keyword
-        
-        if type:
-            params["type"] = type
-        
-        if min_price is not None:
-            params["min_price"] = min_price
-        
-        if max_price is not None:
-            params["max_price"] = max_price
-        
-        if language:
-            params["language"] = language
-        
-        if rankby:
-            params["rankby"] = rankby
-        
-        if name:
-            params["name"] = name
+    return params
+
+def get_mock_places(latitude: float, longitude: float) -> List[Place]:
+    """Hardcoded places around the given point, used when MOCK_GOOGLE_API is enabled."""
+    # Build Place records (photo reference and Google Maps URL) like real results
+    return [to_place(result) for result in mock_nearby_results(latitude, longitude)]
+
+def nearby_cache_key(params: Dict[str, Any]) -> str:
+    """Build a stable cache key from Nearby Search parameters."""
+    return json.dumps(params, sort_keys=True, default=str)
+
+def fetch_nearby(
+    params: Dict[str, Any],
+    api_key: Optional[str] = None,
+    force_refresh: bool = False
+) -> List[Place]:
+    """
+    Run a Nearby Search with the given API parameters, going through the nearby cache.
+    
+    Args:
+        params: Parameters for googlemaps.Client.places_nearby (location, radius, keyword, ...).
+        api_key: Optional API key. If not provided, looks for GOOGLE_API_KEY env var.
+        force_refresh: Skip the cache lookup and always call the API (used by the prefetcher).
         
-        # Call API
-        results = gmaps.places_nearby(**params)
+    Returns:
+        List[Place]: The places returned by the API, in API order.
+    """
+    cache_key = nearby_cache_key(params)
+    if not force_refresh:
+        prefetcher.record("nearby", cache_key, params)
+        cached = nearby_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    try:
+        # Call the provider chain, bounded by the time left for the tool call
+        results, provider = providers.places.call("places_nearby", params, api_key)
         
-        # Get results list
-        places = results.get('results', [])
+        # Keep only the fields we use (plus photo reference and Google Maps URL)
+        places = [to_place(result) for result in results.get('results', [])]
+        if provider.name == "mock":
+            # Fixture photos from a fallback are not real Google photos
+            for place in places:
+                place.photo_reference = ""
         
         # Debug: Log how many results API returned
-        print(f"Google Places API returned {len(places)} results")
+        logger.debug(f"Places provider '{provider.name}' returned {len(places)} results")
         
-        # Add photo URLs and Google Maps URLs
-        for place in places:
-            photos = place.get('photos', [])
-            if photos and len(photos) > 0:
-                # Select the photo with the highest resolution (width * height)
-                # This ensures we get the best quality photo available
-                best_photo = max(photos, key=lambda p: p.get('width', 0) * p.get('height', 0))
-                photo_ref = best_photo.get('photo_reference')
-                if photo_ref:
-                    # Add photo_url to the place data
-                    place['photo_url'] = get_photo_url(photo_ref, key, max_width=400)
-                    # Also keep original photo data
-                    place['photo_reference'] = photo_ref
-            
-            # Add Google Maps URL
-            place_id = place.get('place_id')
-            location = place.get('geometry', {}).get('location', {})
-            lat = location.get('lat')
-            lng = location.get('lng')
-            name = place.get('name')
-            
-            place['maps_url'] = get_google_maps_url(
-                place_id=place_id,
-                latitude=lat,
-                longitude=lng,
-                name=name
-            )
-        
-        # Sort by rating (descending), handling None ratings as 0
-        sorted_places = sorted(places, key=lambda x: x.get('rating', 0) or 0, reverse=True)
-        
-        # Limit to 5 results (API returns up to 20, but we limit to save credits)
-        # Always return up to 5, even if API returned fewer
-        limited_places = sorted_places[:3]
-        print(f"Returning {len(limited_places)} places (limited from {len(sorted_places)})")
-        return limited_places
+        if provider.cacheable:
+            nearby_cache.set(cache_key, places)
+        return places
         
     except Exception as e:
-        print(f"Error querying Google Maps API: {e}")
+        logger.warning(f"Error querying Google Maps API: {e}")
+        stale = nearby_cache.get_stale(cache_key)
+        if stale is not None:
+            return stale
         # Re-raise exception to alert the client of the error
         raise RuntimeError(f"Google Maps API failed: {e}")
+
+prefetcher.register(
+    "nearby",
+    nearby_cache,
+    lambda params: asyncio.to_thread(fetch_nearby, params, force_refresh=True),
+)
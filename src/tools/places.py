@@ -0,0 +1,71 @@
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+@dataclass(slots=True)
+class Place:
+    """
+    The fields of a Google Places result that the tools actually use.
+
+    Built once per upstream result; caches, ranking and formatting work on these
+    records instead of the full API dicts (geometry, photos, plus_code, ...).
+    Only the photo reference is kept: the photo URL carries the API key, so it is built
+    when formatting and never cached or written to snapshots.
+    """
+
+    place_id: str
+    name: str
+    address: str
+    lat: Optional[float] = None
+    lng: Optional[float] = None
+    rating: Optional[float] = None
+    user_ratings_total: Optional[int] = None
+    price_level: Optional[int] = None
+    open_now: Optional[bool] = None
+    business_status: str = ""
+    photo_reference: str = ""
+    maps_url: str = ""
+
+    @classmethod
+    def from_result(cls, result: Dict[str, Any], photo_reference: str = "", maps_url: str = "") -> "Place":
+        """Build a Place from a Nearby Search result; the caller picks the photo and resolves the Google Maps URL."""
+        location = result.get("geometry", {}).get("location", {})
+        return cls(
+            place_id=result.get("place_id", ""),
+            name=result.get("name", "Unknown"),
+            address=result.get("vicinity", result.get("formatted_address", "No address")),
+            lat=location.get("lat"),
+            lng=location.get("lng"),
+            rating=result.get("rating"),
+            user_ratings_total=result.get("user_ratings_total"),
+            price_level=result.get("price_level"),
+            open_now=(result.get("opening_hours") or {}).get("open_now"),
+            business_status=result.get("business_status", ""),
+            photo_reference=photo_reference,
+            maps_url=maps_url,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Place":
+        if "geometry" in data:
+            # Raw API result cached before Place records existed (e.g. in an older snapshot)
+            return cls.from_result(data, _photo_reference(data.get("photo_url", "")), data.get("maps_url", ""))
+        if "photo_url" in data:
+            # Record from an older snapshot that stored the keyed photo URL
+            data = dict(data)
+            data["photo_reference"] = _photo_reference(data.pop("photo_url"))
+        return cls(**data)
+
+def _photo_reference(photo_url: str) -> str:
+    return parse_qs(urlsplit(photo_url).query).get("photoreference", [""])[0]
+
+def encode_places(places: List[Place]) -> List[Dict[str, Any]]:
+    """Snapshot encoder for caches holding lists of places."""
+    return [place.to_dict() for place in places]
+
+def decode_places(data: List[Dict[str, Any]]) -> List[Place]:
+    """Snapshot decoder for caches holding lists of places."""
+    return [Place.from_dict(item) for item in data]
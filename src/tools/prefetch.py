@@ -0,0 +1,168 @@
+import asyncio
+import heapq
+import logging
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from tools.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+class AccessTracker:
+    """
+    Tracks how often cache keys are requested, with exponential decay so that
+    keys which were popular yesterday do not crowd out today's hot keys.
+    Thread-safe: tools record accesses from asyncio.to_thread workers.
+    """
+
+    def __init__(self, half_life: float = 3600.0, max_keys: int = 1000):
+        self.half_life = half_life
+        self.max_keys = max_keys
+        # (kind, key) -> [score, last_update, payload]
+        self._scores: Dict[Tuple[str, str], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def _decayed(self, score: float, last: float, now: float) -> float:
+        return score * 0.5 ** ((now - last) / self.half_life)
+
+    def record(self, kind: str, key: str, payload: Any) -> None:
+        """Register one access to key. payload is what the refresher needs to re-fetch it."""
+        now = time.time()
+        with self._lock:
+            entry = self._scores.get((kind, key))
+            if entry is None:
+                self._scores[(kind, key)] = [1.0, now, payload]
+                if len(self._scores) > self.max_keys:
+                    self._evict(now)
+            else:
+                entry[0] = self._decayed(entry[0], entry[1], now) + 1.0
+                entry[1] = now
+                entry[2] = payload
+
+    def _evict(self, now: float) -> None:
+        # Caller holds the lock. Drop the coldest 10% in one go so eviction does not run on every insert
+        drop = max(1, len(self._scores) // 10)
+        coldest = heapq.nsmallest(
+            drop,
+            list(self._scores.items()),
+            key=lambda item: self._decayed(item[1][0], item[1][1], now),
+        )
+        for scored_key, _ in coldest:
+            self._scores.pop(scored_key, None)
+
+    def top(self, kind: str, k: int, min_score: float = 0.0) -> List[Tuple[str, Any, float]]:
+        """Return up to k (key, payload, score) tuples for kind, hottest first."""
+        now = time.time()
+        # Snapshot under the lock so concurrent record() calls cannot resize the dict mid-iteration
+        with self._lock:
+            candidates = [
+                (key, entry[2], self._decayed(entry[0], entry[1], now))
+                for (entry_kind, key), entry in self._scores.items()
+                if entry_kind == kind
+            ]
+        return heapq.nlargest(
+            k,
+            (c for c in candidates if c[2] >= min_score),
+            key=lambda c: c[2],
+        )
+
+class RefreshAheadPrefetcher:
+    """
+    Background task that refreshes the hottest cache entries shortly before they expire,
+    so popular destinations never fall out of the cache.
+
+    Configuration (environment):
+        PREFETCH_ENABLED: "true" to run the scheduler (default "false").
+        PREFETCH_TOP_K: Number of hottest keys considered per cache (default 20).
+        PREFETCH_LEAD_SECONDS: Refresh entries expiring within this window (default 120).
+        PREFETCH_INTERVAL_SECONDS: How often the scheduler wakes up (default 30).
+        PREFETCH_BUDGET_PER_MINUTE: Max upstream calls spent on prefetching per minute (default 30).
+        PREFETCH_MIN_HITS: Minimum (decayed) access count before a key is prefetched (default 2).
+    """
+
+    def __init__(self, tracker: AccessTracker):
+        self.tracker = tracker
+        self.enabled = os.environ.get("PREFETCH_ENABLED", "false").lower() == "true"
+        self.top_k = int(os.environ.get("PREFETCH_TOP_K", "20"))
+        self.lead = float(os.environ.get("PREFETCH_LEAD_SECONDS", "120"))
+        self.interval = float(os.environ.get("PREFETCH_INTERVAL_SECONDS", "30"))
+        self.budget_per_minute = int(os.environ.get("PREFETCH_BUDGET_PER_MINUTE", "30"))
+        self.min_hits = float(os.environ.get("PREFETCH_MIN_HITS", "2"))
+        self._sources: Dict[str, Tuple[TTLCache, Callable[[Any], Awaitable[Any]]]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._window_start = 0.0
+        self._spent = 0
+
+    def register(self, kind: str, cache: TTLCache, refresh: Callable[[Any], Awaitable[Any]]) -> None:
+        """Register a cache and the coroutine function that re-fetches one of its entries."""
+        self._sources[kind] = (cache, refresh)
+
+    def record(self, kind: str, key: str, payload: Any) -> None:
+        """Record an access to a cache key (cheap; may be called from any thread)."""
+        if self.enabled:
+            self.tracker.record(kind, key, payload)
+
+    def ensure_started(self) -> None:
+        """Start the background scheduler on the running event loop, if enabled and not running."""
+        if not self.enabled or (self._task is not None and not self._task.done()):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._task = loop.create_task(self._run())
+        logger.info("Refresh-ahead prefetcher started")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _take_budget(self) -> bool:
+        now = time.time()
+        if now - self._window_start >= 60:
+            self._window_start = now
+            self._spent = 0
+        if self._spent >= self.budget_per_minute:
+            return False
+        self._spent += 1
+        return True
+
+    async def run_once(self) -> int:
+        """Refresh hot entries that are about to expire. Returns the number of refreshes issued."""
+        refreshed = 0
+        for kind, (cache, refresh) in self._sources.items():
+            for key, payload, score in self.tracker.top(kind, self.top_k, self.min_hits):
+                remaining = cache.expires_in(key)
+                if remaining is None or remaining > self.lead:
+                    continue
+                if not self._take_budget():
+                    logger.info("Prefetch budget exhausted for this minute")
+                    return refreshed
+                try:
+                    await refresh(payload)
+                    refreshed += 1
+                except Exception as e:
+                    logger.warning(f"Prefetch of {kind} key '{key}' failed: {e}")
+        return refreshed
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                count = await self.run_once()
+                if count:
+                    logger.info(f"Prefetcher refreshed {count} cache entries")
+            except Exception as e:
+                logger.error(f"Prefetcher iteration failed: {e}")
+
+access_tracker = AccessTracker(
+    half_life=float(os.environ.get("PREFETCH_HALF_LIFE_SECONDS", "3600"))
+)
+prefetcher = RefreshAheadPrefetcher(access_tracker)
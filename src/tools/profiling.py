@@ -0,0 +1,202 @@
+import asyncio
+import cProfile
+import functools
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Any, Callable, Generator, Optional
+
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+PROFILE_MAX_SECONDS = float(os.environ.get("PROFILE_MAX_SECONDS", "60"))
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get("PROFILE_SAMPLE_INTERVAL", "0.005"))
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profiling session is requested while another one is running."""
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def _collapse(frame: Optional[FrameType]) -> tuple:
+    stack = []
+    while frame is not None:
+        stack.append(frame)
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+def sample_stacks(seconds: float, interval: float = PROFILE_SAMPLE_INTERVAL, tool: Optional[str] = None) -> str:
+    """
+    Sample the stacks of all other threads every `interval` seconds for `seconds` seconds.
+
+    Returns collapsed stacks ("root;...;leaf count" per line), the input format of
+    flamegraph.pl and speedscope. With `tool`, only samples taken while that tool's
+    function is on the stack are kept (e.g. search_nearby formatting on the event loop).
+    """
+    me = threading.get_ident()
+    counts: Counter = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            frames = _collapse(frame)
+            if tool is not None and not any(f.f_code.co_name == tool for f in frames):
+                continue
+            counts[";".join(_frame_label(f) for f in frames)] += 1
+        time.sleep(interval)
+    return "\n".join(f"{stack} {count}" for stack, count in counts.most_common())
+
+class _ProfiledSteps:
+    """
+    Awaitable driving a coroutine with the profiler enabled only while that coroutine
+    itself runs, so other requests interleaved on the event loop are not attributed to it.
+    """
+
+    def __init__(self, coro: Any, profile: cProfile.Profile):
+        self._coro = coro
+        self._profile = profile
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        value: Any = None
+        error: Optional[BaseException] = None
+        while True:
+            self._profile.enable()
+            try:
+                if error is not None:
+                    yielded = self._coro.throw(error)
+                else:
+                    yielded = self._coro.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self._profile.disable()
+            value, error = None, None
+            try:
+                value = yield yielded
+            except GeneratorExit:
+                self._coro.close()
+                raise
+            except BaseException as e:
+                error = e
+
+class _ToolSession:
+    """
+    One profile_tool session. Profiled calls keep a reference to their session, so a call
+    still running when the window closes only updates that session, never the next one.
+    """
+
+    def __init__(self, tool: str, calls: int):
+        self.tool = tool
+        self.calls_left = calls
+        self.running = 0
+        self.finished = 0
+        self.profile = cProfile.Profile()
+        self.done = asyncio.Event()
+
+    def call_finished(self) -> None:
+        self.running -= 1
+        self.finished += 1
+        if self.calls_left <= 0 and self.running <= 0:
+            self.done.set()
+
+class ToolProfiler:
+    """
+    One profiling session at a time, started from the admin route:
+    whole-process stack sampling, cProfile of the event loop thread for N seconds, or
+    cProfile of the next N calls of a single tool (functions decorated with @profiled).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._session: Optional[_ToolSession] = None
+
+    def armed_for(self, tool: str) -> Optional[_ToolSession]:
+        """The armed session if the next call of `tool` should be profiled."""
+        session = self._session
+        if session is None or session.tool != tool or session.calls_left <= 0:
+            return None
+        session.calls_left -= 1
+        session.running += 1
+        return session
+
+    def _acquire(self) -> None:
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("Another profiling session is running")
+
+    async def sample(self, seconds: float, tool: Optional[str] = None) -> str:
+        self._acquire()
+        try:
+            return await asyncio.to_thread(sample_stacks, seconds, PROFILE_SAMPLE_INTERVAL, tool)
+        finally:
+            self._lock.release()
+
+    async def profile_loop(self, seconds: float) -> cProfile.Profile:
+        """cProfile everything running on the event loop thread for `seconds` seconds."""
+        self._acquire()
+        try:
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profile.disable()
+            return profile
+        finally:
+            self._lock.release()
+
+    async def profile_tool(self, tool: str, calls: int, seconds: float) -> tuple:
+        """
+        cProfile the next `calls` calls of `tool`, waiting at most `seconds`.
+        Returns (profile, calls profiled); only calls that finished within the window count.
+        """
+        self._acquire()
+        try:
+            session = self._session = _ToolSession(tool, calls)
+            try:
+                await asyncio.wait_for(session.done.wait(), timeout=seconds)
+            except asyncio.TimeoutError:
+                pass
+            return session.profile, session.finished
+        finally:
+            self._session = None
+            self._lock.release()
+
+def format_pstats(profile: cProfile.Profile, sort: str = "cumulative", limit: int = 60) -> str:
+    stream = io.StringIO()
+    pstats.Stats(profile, stream=stream).sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+def dump_pstats(profile: cProfile.Profile) -> bytes:
+    """The profile in the binary format written by pstats.dump_stats (for snakeviz, gprof2dot...)."""
+    profile.create_stats()
+    return marshal.dumps(profile.stats)
+
+profiler = ToolProfiler()
+# Names of the tools that can be profiled individually
+profiled_tools = set()
+
+def profiled(func: Callable) -> Callable:
+    """
+    Decorator for async MCP tool functions: lets an admin profile the next calls of this tool.
+    Costs one attribute check per call when no session is armed. Place it directly above the function.
+    """
+    name = func.__name__
+    profiled_tools.add(name)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        session = profiler.armed_for(name)
+        if session is None:
+            return await func(*args, **kwargs)
+        try:
+            return await _ProfiledSteps(func(*args, **kwargs), session.profile)
+        finally:
+            session.call_finished()
+    return wrapper
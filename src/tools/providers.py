@@ -0,0 +1,314 @@
+import asyncio
+import copy
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from tools import cassette, deadline, fixtures, transport
+from tools.tracing import child_span
+
+if TYPE_CHECKING:
+    # Imported on first use: googlemaps (requests) is slow to import
+    import googlemaps
+
+logger = logging.getLogger(__name__)
+
+# Upstream backends are resolved once at startup. Each capability has an ordered chain
+# (e.g. PLACES_PROVIDERS=google,cassette,mock): the first provider serves the call, the
+# next ones are tried in order when it fails or runs out of its attempt budget.
+google_api_key = os.environ.get("GOOGLE_API_KEY")
+meteoblue_api_key = os.environ.get("METEOBLUE_API_KEY")
+# Local services speaking the Google Maps / meteoblue HTTP APIs (emulators, internal mirrors)
+GOOGLE_STANDIN_URL = os.environ.get("GOOGLE_STANDIN_URL")
+METEOBLUE_STANDIN_URL = os.environ.get("METEOBLUE_STANDIN_URL")
+METEOBLUE_BASE_URL = "https://my.meteoblue.com/packages"
+
+_GOOGLE_DEFAULT = "mock" if os.environ.get("MOCK_GOOGLE_API", "false").lower() == "true" else "google"
+GOOGLE_PROVIDERS = os.environ.get("GOOGLE_PROVIDERS", _GOOGLE_DEFAULT)
+WEATHER_PROVIDERS = os.environ.get(
+    "WEATHER_PROVIDERS",
+    "mock" if os.environ.get("MOCK_WEATHER_API", "false").lower() == "true" else "meteoblue"
+)
+# Budget of an attempt that still has fallbacks behind it, so a slow primary leaves time for them:
+# at most PROVIDER_ATTEMPT_TIMEOUT seconds and at most this share of the tool call's remaining time
+PROVIDER_ATTEMPT_TIMEOUT = float(os.environ.get("PROVIDER_ATTEMPT_TIMEOUT", "4"))
+PROVIDER_ATTEMPT_SHARE = float(os.environ.get("PROVIDER_ATTEMPT_SHARE", "0.5"))
+# Consecutive failures after which a provider is skipped (moved to the end of its chain) for a while
+PROVIDER_FAILURE_THRESHOLD = int(os.environ.get("PROVIDER_FAILURE_THRESHOLD", "3"))
+PROVIDER_COOLDOWN = float(os.environ.get("PROVIDER_COOLDOWN", "30"))
+
+class Provider:
+    """One upstream backend. Subclasses implement the operations of the capabilities they serve."""
+
+    name = ""
+    # Whether responses may be stored in the tool caches (fixture data must not outlive a fallback)
+    cacheable = True
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.skip_until = 0.0
+
+    def available(self, now: float) -> bool:
+        return now >= self.skip_until
+
+    def record(self, ok: bool) -> None:
+        self.calls += 1
+        if ok:
+            self.consecutive_failures = 0
+            return
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= PROVIDER_FAILURE_THRESHOLD:
+            self.skip_until = time.monotonic() + PROVIDER_COOLDOWN
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "failures": self.failures,
+            "cooling_down": not self.available(time.monotonic()),
+        }
+
+class GoogleProvider(Provider):
+    """Google Maps web services, or a stand-in serving the same API at base_url."""
+
+    def __init__(self, name: str, api_key: Optional[str], base_url: Optional[str] = None):
+        super().__init__()
+        self.name = name
+        self.api_key = api_key
+        self.base_url = base_url
+
+    def _client(self, api_key: Optional[str], timeout: float) -> "googlemaps.Client":
+        import googlemaps
+
+        key = api_key or self.api_key
+        if not key:
+            raise ValueError("Google API Key is required. Set GOOGLE_API_KEY env var.")
+        options = {"base_url": self.base_url} if self.base_url else {}
+        # Clients are cheap per call; the shared session keeps the connections alive between them
+        return googlemaps.Client(
+            key=key, timeout=timeout, retry_timeout=timeout,
+            requests_session=transport.requests_session(), **options
+        )
+
+    def _call(self, service: str, request: Dict[str, Any], api_key: Optional[str], timeout: float, fetch) -> Any:
+        if self.base_url:
+            return fetch(self._client(api_key, timeout))
+        # Only the real API goes through the cassette layer (the client, and so the key, is not needed on replay)
+        return cassette.call(service, request, lambda: fetch(self._client(api_key, timeout)))
+
+    def places_nearby(self, params: Dict[str, Any], api_key: Optional[str], timeout: float) -> Dict[str, Any]:
+        with child_span("upstream.google.places_nearby", provider=self.name) as span:
+            results = self._call(
+                "google.places_nearby", params, api_key, timeout,
+                lambda client: client.places_nearby(**params)
+            )
+            span.set("result_count", len(results.get('results', [])))
+        return results
+
+    def geocode(self, address: str, api_key: Optional[str], timeout: float) -> List[Dict[str, Any]]:
+        with child_span("upstream.google.geocode", provider=self.name) as span:
+            results = self._call(
+                "google.geocode", {"address": address}, api_key, timeout,
+                lambda client: client.geocode(address)
+            )
+            span.set("result_count", len(results))
+        return results
+
+    def distance_matrix(self, params: Dict[str, Any], api_key: Optional[str], timeout: float) -> Dict[str, Any]:
+        elements = len(params["origins"]) * len(params["destinations"])
+        with child_span("upstream.google.distance_matrix", provider=self.name, mode=params["mode"], elements=elements) as span:
+            result = self._call(
+                "google.distance_matrix", params, api_key, timeout,
+                lambda client: client.distance_matrix(**params)
+            )
+            span.set("status", result.get('status'))
+        return result
+
+class MeteoblueProvider(Provider):
+    """meteoblue packages API, or a stand-in serving the same API at base_url."""
+
+    def __init__(self, name: str, api_key: Optional[str], base_url: str):
+        super().__init__()
+        self.name = name
+        self.api_key = api_key
+        self.base_url = base_url
+
+    async def forecast(self, request: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        is_meteoblue = self.base_url == METEOBLUE_BASE_URL
+        if not self.api_key and is_meteoblue and not cassette.replaying():
+            raise ValueError("Meteoblue API Key is required. Set METEOBLUE_API_KEY env var.")
+
+        client = transport.http_client()
+        url = f"{self.base_url}/basic-1h_basic-day"
+        # The API key is left out of the cassette key so recordings never contain it
+        params = {"apikey": self.api_key, **request}
+        with child_span("upstream.meteoblue", provider=self.name) as span:
+            async def fetch() -> Dict[str, Any]:
+                response = await client.get(url, params=params, timeout=timeout)
+                span.set("status_code", response.status_code)
+                span.set("response_bytes", len(response.content))
+                response.raise_for_status()
+                return response.json()
+
+            if not is_meteoblue:
+                return await fetch()
+            return await cassette.acall("meteoblue.basic-1h_basic-day", request, fetch)
+
+class CassetteProvider(Provider):
+    """Recorded responses from CASSETTE_DIR, served without touching the network."""
+
+    name = "cassette"
+
+    def places_nearby(self, params: Dict[str, Any], api_key: Optional[str], timeout: float) -> Dict[str, Any]:
+        return cassette.replay("google.places_nearby", params)
+
+    def geocode(self, address: str, api_key: Optional[str], timeout: float) -> List[Dict[str, Any]]:
+        return cassette.replay("google.geocode", {"address": address})
+
+    def distance_matrix(self, params: Dict[str, Any], api_key: Optional[str], timeout: float) -> Dict[str, Any]:
+        return cassette.replay("google.distance_matrix", params)
+
+    async def forecast(self, request: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        return cassette.replay("meteoblue.basic-1h_basic-day", request)
+
+class MockProvider(Provider):
+    """Built-in fixture data (tools.fixtures)."""
+
+    name = "mock"
+    cacheable = False
+
+    def places_nearby(self, params: Dict[str, Any], api_key: Optional[str], timeout: float) -> Dict[str, Any]:
+        return {"status": "OK", "results": fixtures.mock_nearby_results(*params["location"])}
+
+    def geocode(self, address: str, api_key: Optional[str], timeout: float) -> List[Dict[str, Any]]:
+        return [{"geometry": {"location": dict(fixtures.MOCK_LOCATION)}}]
+
+    def distance_matrix(self, params: Dict[str, Any], api_key: Optional[str], timeout: float) -> Dict[str, Any]:
+        return fixtures.mock_distance_matrix(params["origins"], params["destinations"])
+
+    async def forecast(self, request: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        return copy.deepcopy(fixtures.MOCK_WEATHER)
+
+class ProviderChain:
+    """Ordered providers of one capability (places, geocoding, routing or weather) with fallback."""
+
+    def __init__(self, capability: str, providers: List[Provider]):
+        self.capability = capability
+        self.providers = providers
+
+    @property
+    def mocked(self) -> bool:
+        """True when the fixtures are the primary source (MOCK_GOOGLE_API / MOCK_WEATHER_API behavior)."""
+        return self.providers[0].name == "mock"
+
+    def _ordered(self) -> List[Provider]:
+        # Providers cooling down after repeated failures are kept as a last resort
+        now = time.monotonic()
+        return sorted(self.providers, key=lambda provider: not provider.available(now))
+
+    def _attempt_timeout(self, last: bool) -> float:
+        if last:
+            return deadline.upstream_timeout()
+        budget = min(deadline.UPSTREAM_TIMEOUT, PROVIDER_ATTEMPT_TIMEOUT)
+        left = deadline.remaining()
+        if left is not None:
+            # With a short tool deadline the fixed budget could use all of it; keep some for the fallbacks
+            budget = min(budget, left * PROVIDER_ATTEMPT_SHARE)
+        return deadline.upstream_timeout(budget)
+
+    def _failed(self, provider: Provider, error: Exception, errors: List[Exception]) -> None:
+        provider.record(False)
+        errors.append(error)
+        logger.warning(f"{self.capability} provider '{provider.name}' failed: {error!r}")
+
+    def call(self, operation: str, *args: Any) -> Tuple[Any, Provider]:
+        """
+        Run a blocking operation on the first provider that succeeds.
+
+        Returns:
+            (response, provider that served it). Raises the primary's error if every provider fails.
+        """
+        providers = self._ordered()
+        errors: List[Exception] = []
+        for index, provider in enumerate(providers):
+            timeout = self._attempt_timeout(index == len(providers) - 1)
+            try:
+                response = getattr(provider, operation)(*args, timeout)
+            except deadline.DeadlineExceeded:
+                raise
+            except Exception as e:
+                self._failed(provider, e, errors)
+                continue
+            provider.record(True)
+            return response, provider
+        raise errors[0]
+
+    async def acall(self, operation: str, *args: Any) -> Tuple[Any, Provider]:
+        """Async counterpart of call() for coroutine operations (weather)."""
+        providers = self._ordered()
+        errors: List[Exception] = []
+        for index, provider in enumerate(providers):
+            timeout = self._attempt_timeout(index == len(providers) - 1)
+            try:
+                response = await getattr(provider, operation)(*args, timeout)
+            except (deadline.DeadlineExceeded, asyncio.CancelledError):
+                raise
+            except Exception as e:
+                self._failed(provider, e, errors)
+                continue
+            provider.record(True)
+            return response, provider
+        raise errors[0]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [provider.stats() for provider in self.providers]
+
+def _build(name: str, capability: str) -> Provider:
+    if capability == "weather":
+        builders = {
+            "meteoblue": lambda: MeteoblueProvider("meteoblue", meteoblue_api_key, METEOBLUE_BASE_URL),
+            "standin": lambda: MeteoblueProvider(
+                "standin", os.environ.get("METEOBLUE_STANDIN_KEY", meteoblue_api_key), METEOBLUE_STANDIN_URL
+            ),
+        }
+        standin_env = "METEOBLUE_STANDIN_URL"
+    else:
+        builders = {
+            "google": lambda: GoogleProvider("google", google_api_key),
+            # googlemaps only accepts keys that look like Google keys ("AIza...")
+            "standin": lambda: GoogleProvider(
+                "standin", os.environ.get("GOOGLE_STANDIN_KEY", google_api_key or "AIzaStandIn"), GOOGLE_STANDIN_URL
+            ),
+        }
+        standin_env = "GOOGLE_STANDIN_URL"
+    builders["cassette"] = CassetteProvider
+    builders["mock"] = MockProvider
+    if name not in builders:
+        raise ValueError(f"Unknown {capability} provider '{name}' (expected one of: {', '.join(builders)})")
+    if name == "standin" and not os.environ.get(standin_env):
+        raise ValueError(f"The {capability} 'standin' provider needs {standin_env}")
+    return builders[name]()
+
+def _chain(capability: str, default: str) -> ProviderChain:
+    spec = os.environ.get(f"{capability.upper()}_PROVIDERS") or default
+    names = [name.strip().lower() for name in spec.split(",") if name.strip()]
+    chain = ProviderChain(capability, [_build(name, capability) for name in names])
+    logger.info(f"{capability} providers: {', '.join(p.name for p in chain.providers)}")
+    return chain
+
+places = _chain("places", GOOGLE_PROVIDERS)
+geocoding = _chain("geocoding", GOOGLE_PROVIDERS)
+routing = _chain("routing", GOOGLE_PROVIDERS)
+weather = _chain("weather", WEATHER_PROVIDERS)
+
+async def close() -> None:
+    """Close the shared upstream connections (call on shutdown)."""
+    await transport.aclose()
+
+def provider_stats() -> Dict[str, List[Dict[str, Any]]]:
+    """Per-capability provider call/failure counts, for the /stats endpoint."""
+    return {chain.capability: chain.stats() for chain in (places, geocoding, routing, weather)}
@@ -0,0 +1,127 @@
+import heapq
+import os
+from typing import Callable, Dict, List, Optional
+
+from tools.geo import haversine_m
+from tools.places import Place
+
+# Number of "virtual" reviews at the average rating that every place starts with.
+# Higher values trust small review counts less.
+PRIOR_VOTES = float(os.environ.get("RANKING_PRIOR_VOTES", "50"))
+DEFAULT_PRIOR_RATING = 4.0
+
+RANKING_STRATEGIES = ("rating", "bayesian", "distance", "price", "open_now", "balanced")
+
+class RankingContext:
+    """Everything a scorer needs besides the place itself, computed once per ranking."""
+
+    def __init__(
+        self,
+        places: List[Place],
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius: Optional[int] = None,
+        min_price: Optional[int] = None,
+        max_price: Optional[int] = None
+    ):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.radius = radius or 1000
+        self.min_price = min_price
+        self.max_price = max_price
+        ratings = [p.rating for p in places if p.rating]
+        self.mean_rating = sum(ratings) / len(ratings) if ratings else DEFAULT_PRIOR_RATING
+
+def bayesian_rating(place: Place, ctx: RankingContext) -> float:
+    """Rating shrunk towards the average in proportion to how few reviews it has (0-5)."""
+    rating = place.rating or 0
+    votes = place.user_ratings_total or 0
+    if not rating:
+        # Unrated places go last
+        return 0.0
+    return (votes * rating + PRIOR_VOTES * ctx.mean_rating) / (votes + PRIOR_VOTES)
+
+def distance_score(place: Place, ctx: RankingContext) -> float:
+    """1.0 at the search center, 0.5 at the search radius, decaying beyond (0-1)."""
+    if ctx.latitude is None or ctx.longitude is None or place.lat is None or place.lng is None:
+        return 0.0
+    meters = haversine_m(ctx.latitude, ctx.longitude, place.lat, place.lng)
+    return 1.0 / (1.0 + meters / ctx.radius)
+
+def price_score(place: Place, ctx: RankingContext) -> float:
+    """1.0 inside the requested price range, lower the further outside it; 0.5 if unknown (0-1)."""
+    level = place.price_level
+    if level is None:
+        return 0.5
+    if ctx.min_price is None and ctx.max_price is None:
+        # No preference: cheaper is slightly better
+        return 1.0 - level / 8.0
+    low = ctx.min_price if ctx.min_price is not None else 0
+    high = ctx.max_price if ctx.max_price is not None else 4
+    if low <= level <= high:
+        return 1.0
+    gap = low - level if level < low else level - high
+    return max(0.0, 1.0 - gap / 4.0)
+
+def open_now_score(place: Place, ctx: RankingContext) -> float:
+    """1.0 if open now, 0.0 if closed, 0.5 if unknown."""
+    open_now = place.open_now
+    if open_now is None:
+        return 0.5
+    return 1.0 if open_now else 0.0
+
+def balanced_score(place: Place, ctx: RankingContext) -> float:
+    """Weighted mix of review-adjusted rating, proximity, price fit and opening status."""
+    return (
+        0.6 * bayesian_rating(place, ctx) / 5.0
+        + 0.2 * distance_score(place, ctx)
+        + 0.1 * price_score(place, ctx)
+        + 0.1 * open_now_score(place, ctx)
+    )
+
+_SCORERS: Dict[str, Callable[[Place, RankingContext], float]] = {
+    "rating": lambda place, ctx: place.rating or 0,
+    "bayesian": bayesian_rating,
+    "distance": distance_score,
+    "price": lambda place, ctx: (price_score(place, ctx), bayesian_rating(place, ctx)),
+    "open_now": lambda place, ctx: (open_now_score(place, ctx), bayesian_rating(place, ctx)),
+    "balanced": balanced_score,
+}
+
+def rank_places(
+    places: List[Place],
+    limit: int,
+    strategy: str = "rating",
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    radius: Optional[int] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None
+) -> List[Place]:
+    """
+    Select the top `limit` places with the given strategy.
+
+    Uses heapq.nlargest, so only the top-k is kept while scanning all candidates
+    (ties keep the upstream order).
+
+    Args:
+        places: Candidate places.
+        limit: Number of places to return.
+        strategy: One of RANKING_STRATEGIES:
+            - "rating": raw rating (legacy behavior).
+            - "bayesian": rating weighted by user_ratings_total.
+            - "distance": closest to the search center first.
+            - "price": best fit for min_price/max_price, then bayesian rating.
+            - "open_now": open places first, then bayesian rating.
+            - "balanced": mix of bayesian rating, distance, price fit and open-now.
+        latitude, longitude, radius: Search center and radius (used by distance-aware strategies).
+        min_price, max_price: Requested price range (used by price-aware strategies).
+
+    Returns:
+        List of at most `limit` places, best first.
+    """
+    scorer = _SCORERS.get(strategy)
+    if scorer is None:
+        raise ValueError(f"ranking must be one of: {', '.join(RANKING_STRATEGIES)}")
+    ctx = RankingContext(places, latitude, longitude, radius, min_price, max_price)
+    return heapq.nlargest(limit, places, key=lambda place: scorer(place, ctx))
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.distance import distance_matrix
+from tools.geo import haversine_m, parse_lat_lng
+from tools.geocoding import geocode_address
+from tools.places import Place
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds on straight-line speed per mode (m/s). A candidate whose straight-line
+# distance cannot be covered in time even at this speed is dropped without asking Google.
+REACH_MAX_SPEEDS = {
+    "walking": 1.8,
+    "bicycling": 7.0,
+    "driving": 35.0,
+    "transit": 30.0,
+}
+# Candidates considered before the travel-time filter (all merged Nearby Search results up to this many)
+MAX_REACH_CANDIDATES = int(os.environ.get("MAX_REACH_CANDIDATES", "60"))
+MAX_REACH_RESULTS = 5
+
+async def resolve_point(location: str, api_key: Optional[str] = None) -> Tuple[float, float]:
+    """Coordinates of a "lat,lng" string, or of an address/place name via the geocode cache."""
+    try:
+        return parse_lat_lng(location)
+    except ValueError:
+        pass
+    result = await asyncio.to_thread(geocode_address, location, api_key)
+    if not isinstance(result, dict):
+        raise ValueError(str(result))
+    return result["lat"], result["lng"]
+
+async def filter_reachable(
+    places: List[Place],
+    target: str,
+    mode: str = "walking",
+    max_minutes: float = 15,
+    api_key: Optional[str] = None
+) -> List[Tuple[Place, Dict[str, Any]]]:
+    """
+    Keep the places from which `target` can be reached within `max_minutes` by `mode`.
+
+    Candidates are first pre-filtered by straight-line distance (REACH_MAX_SPEEDS), then the
+    remaining ones are sent as origins of a single batched Distance Matrix request to the target.
+
+    Returns:
+        (place, distance matrix element) pairs, fastest first. Elements carry "distance",
+        "duration", "distance_m" and "duration_s".
+    """
+    mode = mode.lower()
+    if mode not in REACH_MAX_SPEEDS:
+        raise ValueError(f"reach_mode must be one of: {', '.join(REACH_MAX_SPEEDS)}")
+    if max_minutes <= 0:
+        raise ValueError("max_travel_minutes must be positive")
+
+    target_lat, target_lng = await resolve_point(target, api_key)
+    max_seconds = max_minutes * 60
+    max_meters = max_seconds * REACH_MAX_SPEEDS[mode]
+    candidates = [
+        place
+        for place in places
+        if place.lat is not None and place.lng is not None
+        and haversine_m(place.lat, place.lng, target_lat, target_lng) <= max_meters
+    ]
+    logger.info(f"Reachability: {len(candidates)} of {len(places)} places pass the straight-line pre-filter")
+    if not candidates:
+        return []
+
+    rows = await asyncio.to_thread(
+        distance_matrix,
+        [f"{place.lat},{place.lng}" for place in candidates],
+        [f"{target_lat},{target_lng}"],
+        mode,
+        api_key
+    )
+    reachable = []
+    for place, row in zip(candidates, rows):
+        element = row[0]
+        if element.get("error"):
+            raise RuntimeError(f"Error from Google API: {element['status']}")
+        if element["status"] == "OK" and element["duration_s"] <= max_seconds:
+            reachable.append((place, element))
+    reachable.sort(key=lambda item: item[1]["duration_s"])
+    return reachable
@@ -0,0 +1,44 @@
+import os
+import secrets
+from typing import List, Optional, Tuple
+
+from tools.cache import TTLCache
+from tools.places import Place
+
+# Result sets only need to outlive a planning conversation; they are not snapshotted
+RESULT_SET_TTL = float(os.environ.get("RESULT_SET_TTL", "1800"))
+RESULT_SET_MAX_ENTRIES = int(os.environ.get("RESULT_SET_MAX_ENTRIES", "2000"))
+
+result_sets = TTLCache("result_sets", ttl=RESULT_SET_TTL, max_entries=RESULT_SET_MAX_ENTRIES, persist=False)
+
+def store_result_set(places: List[Place]) -> str:
+    """Keep the places returned by a search server-side and return a short ID referring to them."""
+    result_set_id = f"rs_{secrets.token_urlsafe(6)}"
+    result_sets.set(result_set_id, list(places))
+    return result_set_id
+
+def load_result_set(result_set_id: str, indices: Optional[List[int]] = None) -> List[Tuple[int, Place]]:
+    """
+    Places of a stored result set as (index, place) pairs.
+
+    Args:
+        result_set_id: ID returned by a search tool.
+        indices: Optional 1-based positions as numbered in the search output (default: all places).
+    """
+    places = result_sets.get(result_set_id)
+    if places is None:
+        raise ValueError(f"Result set '{result_set_id}' not found or expired. Run the search again.")
+    if not indices:
+        return list(enumerate(places, 1))
+    selected = []
+    for index in indices:
+        if not 1 <= index <= len(places):
+            raise ValueError(f"Index {index} is out of range for result set '{result_set_id}' (1-{len(places)})")
+        selected.append((index, places[index - 1]))
+    return selected
+
+def place_coordinates(place: Place) -> Optional[Tuple[float, float]]:
+    """(lat, lng) of a place, or None if it has no location."""
+    if place.lat is None or place.lng is None:
+        return None
+    return place.lat, place.lng
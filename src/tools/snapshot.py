@@ -0,0 +1,242 @@
+import asyncio
+import atexit
+import glob
+import logging
+import mmap
+import os
+import re
+import socket
+import struct
+import time
+import uuid
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tools import speedups
+from tools.cache import registry
+
+logger = logging.getLogger(__name__)
+
+CACHE_SNAPSHOT_PATH = os.environ.get("CACHE_SNAPSHOT_PATH", "")
+CACHE_SNAPSHOT_INTERVAL = float(os.environ.get("CACHE_SNAPSHOT_INTERVAL", "300"))
+CACHE_SNAPSHOT_MAX_AGE = float(os.environ.get("CACHE_SNAPSHOT_MAX_AGE", str(24 * 3600)))
+
+# File layout:
+#   header: magic (8s) | index offset (Q) | index length (Q) | created at (d)
+#   payloads: one zlib-compressed JSON blob per cache entry
+#   index: zlib-compressed JSON {cache name: [[key, offset, length, timestamp, ttl], ...]}
+MAGIC = b"MCPSNAP1"
+HEADER = struct.Struct("<8sQQd")
+
+def _replica_id() -> str:
+    # The container hostname is unique per replica (docker compose `deploy.replicas`)
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", socket.gethostname()) or "local"
+
+def _encode(data: Any) -> bytes:
+    return zlib.compress(speedups.dumpb(data))
+
+class _LazyEntry(dict):
+    """
+    Cache entry restored from a snapshot. "timestamp" and "ttl" are available immediately;
+    "data" is decompressed from the memory-mapped file the first time it is read.
+    """
+
+    __slots__ = ("_buffer", "_offset", "_length", "_decode")
+
+    def __init__(
+        self,
+        buffer: mmap.mmap,
+        offset: int,
+        length: int,
+        timestamp: float,
+        ttl: float,
+        decode: Optional[Callable[[Any], Any]] = None
+    ):
+        super().__init__(timestamp=timestamp, ttl=ttl)
+        self._buffer = buffer
+        self._offset = offset
+        self._length = length
+        self._decode = decode
+
+    def raw(self) -> Optional[bytes]:
+        """Compressed payload, or None once the entry has been decoded."""
+        if "data" in self:
+            return None
+        return self._buffer[self._offset:self._offset + self._length]
+
+    def __missing__(self, key: str) -> Any:
+        if key != "data":
+            raise KeyError(key)
+        data = speedups.loads(zlib.decompress(self._buffer[self._offset:self._offset + self._length]))
+        if self._decode is not None:
+            data = self._decode(data)
+        self["data"] = data
+        return data
+
+class CacheSnapshotter:
+    """
+    Periodically writes every persistent TTLCache to a compact binary file and restores
+    them on startup, so restarts and deploys do not start from an empty cache.
+
+    Each replica writes its own file (CACHE_SNAPSHOT_PATH suffixed with the hostname), so
+    replicas sharing a volume never overwrite each other's entries. On startup every fresh
+    snapshot file is merged, newest first.
+
+    Configuration (environment):
+        CACHE_SNAPSHOT_PATH: Snapshot file prefix (e.g. on a Docker volume). Empty disables snapshots.
+        CACHE_SNAPSHOT_INTERVAL: Seconds between snapshots (default 300).
+        CACHE_SNAPSHOT_MAX_AGE: Snapshots older than this are ignored on startup and removed (default 86400).
+    """
+
+    def __init__(self, path: str, interval: float, max_age: float, replica: Optional[str] = None):
+        self.path = path
+        self.interval = interval
+        self.max_age = max_age
+        self.replica = replica or _replica_id()
+        self._task: Optional[asyncio.Task] = None
+        # Kept open while restored entries may still be decoded from them
+        self._mapped: List[mmap.mmap] = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    @property
+    def own_path(self) -> str:
+        """The file this replica writes."""
+        return f"{self.path}.{self.replica}"
+
+    def snapshot_files(self) -> List[str]:
+        """Snapshot files of every replica (plus a single-file snapshot from older versions)."""
+        files = [path for path in glob.glob(glob.escape(self.path) + ".*") if not path.endswith(".tmp")]
+        if os.path.isfile(self.path):
+            files.append(self.path)
+        return sorted(files)
+
+    def save(self) -> int:
+        """Write all persistent caches to the snapshot file atomically. Returns the number of entries."""
+        now = time.time()
+        index: Dict[str, List[list]] = {}
+        count = 0
+        # Unique temp name, so a partial write never replaces a complete snapshot
+        tmp_path = f"{self.own_path}.{uuid.uuid4().hex}.tmp"
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, 0, 0, now))
+            for name, cache in list(registry.items()):
+                if not cache.persist:
+                    continue
+                rows = index.setdefault(name, [])
+                for key, entry in cache.items():
+                    if entry["timestamp"] + entry["ttl"] <= now:
+                        continue
+                    # Entries restored from the previous snapshot and never read are copied as-is
+                    blob = entry.raw() if isinstance(entry, _LazyEntry) else None
+                    if blob is None:
+                        try:
+                            data = entry["data"]
+                            blob = _encode(cache.encode(data) if cache.encode else data)
+                        except (TypeError, ValueError) as e:
+                            logger.warning(f"Skipping unserializable {name} cache entry: {e}")
+                            continue
+                    rows.append([key, f.tell(), len(blob), entry["timestamp"], entry["ttl"]])
+                    f.write(blob)
+                    count += 1
+            index_blob = zlib.compress(speedups.dumpb(index))
+            index_offset = f.tell()
+            f.write(index_blob)
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, index_offset, len(index_blob), now))
+        os.replace(tmp_path, self.own_path)
+        self._remove_expired(now)
+        return count
+
+    def _remove_expired(self, now: float) -> None:
+        # Files left by replicas that no longer exist (hostnames change on redeploy)
+        for path in self.snapshot_files():
+            try:
+                if path != self.own_path and now - os.path.getmtime(path) > self.max_age:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def _open(self, path: str, now: float) -> Optional[Tuple[float, mmap.mmap, Dict[str, List[list]]]]:
+        """Map one snapshot file and read its index (None if unreadable or too old)."""
+        try:
+            with open(path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, index_offset, index_length, created_at = HEADER.unpack_from(buffer, 0)
+            if magic != MAGIC:
+                logger.warning(f"Ignoring cache snapshot {path}: unknown format")
+                buffer.close()
+                return None
+            if now - created_at > self.max_age:
+                logger.info(f"Ignoring cache snapshot {path}: {int(now - created_at)}s old")
+                buffer.close()
+                return None
+            index = speedups.loads(zlib.decompress(buffer[index_offset:index_offset + index_length]))
+        except (OSError, ValueError, struct.error, zlib.error) as e:
+            logger.warning(f"Could not read cache snapshot {path}: {e}")
+            return None
+        return created_at, buffer, index
+
+    def load(self) -> int:
+        """
+        Restore caches from every replica's snapshot file that is fresh enough.
+        Files are memory-mapped and entries are only decoded when first read; when several
+        files hold the same key, the newest snapshot wins.
+        Returns the number of entries restored.
+        """
+        if not self.enabled:
+            return 0
+        now = time.time()
+        snapshots = [snapshot for snapshot in (self._open(path, now) for path in self.snapshot_files()) if snapshot]
+        # Newest first: restore() keeps the first entry seen for a key
+        snapshots.sort(key=lambda snapshot: snapshot[0], reverse=True)
+
+        restored = 0
+        for _, buffer, index in snapshots:
+            for name, rows in index.items():
+                cache = registry.get(name)
+                if cache is None:
+                    continue
+                for key, offset, length, timestamp, ttl in rows:
+                    # Staleness check: only restore entries that are still within their TTL
+                    if timestamp + ttl <= now:
+                        continue
+                    if cache.restore(key, _LazyEntry(buffer, offset, length, timestamp, ttl, cache.decode)):
+                        restored += 1
+            self._mapped.append(buffer)
+        if snapshots:
+            logger.info(f"Restored {restored} cache entries from {len(snapshots)} snapshot files under {self.path}")
+        return restored
+
+    def save_quietly(self) -> None:
+        try:
+            count = self.save()
+            logger.info(f"Wrote {count} cache entries to {self.own_path}")
+        except Exception as e:
+            logger.warning(f"Cache snapshot failed: {e}")
+
+    def ensure_started(self) -> None:
+        """Start the periodic snapshot task on the running event loop, if enabled and not running."""
+        if not self.enabled or (self._task is not None and not self._task.done()):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await asyncio.to_thread(self.save_quietly)
+
+snapshotter = CacheSnapshotter(CACHE_SNAPSHOT_PATH, CACHE_SNAPSHOT_INTERVAL, CACHE_SNAPSHOT_MAX_AGE)
+
+if snapshotter.enabled:
+    # Final snapshot on graceful shutdown (container stop / redeploy)
+    atexit.register(snapshotter.save_quietly)
@@ -0,0 +1,61 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Union
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: uvloop event loop and orjson for the JSON this server writes itself (traces,
+# cache snapshots, cassettes). Both are optional dependencies; without them FAST_MODE
+# falls back to the stdlib. MCP messages are serialized by the MCP SDK (pydantic).
+FAST_MODE = os.environ.get("FAST_MODE", "false").lower() == "true"
+
+orjson = None
+if FAST_MODE:
+    try:
+        import orjson
+    except ImportError:
+        logger.warning("FAST_MODE is on but orjson is not installed; using the stdlib json module")
+
+_use_orjson = FAST_MODE and orjson is not None
+
+def install_event_loop() -> str:
+    """
+    Make new event loops uvloop loops when FAST_MODE is on and uvloop is installed.
+    Must run before the server starts its loop. Returns the loop implementation in use.
+    """
+    if not FAST_MODE:
+        return "asyncio"
+    try:
+        import uvloop
+    except ImportError:
+        logger.warning("FAST_MODE is on but uvloop is not installed; using the default asyncio loop")
+        return "asyncio"
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return "uvloop"
+
+def dumps(obj: Any) -> str:
+    """Compact JSON text (non-JSON values are converted with str())."""
+    if _use_orjson:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), default=str)
+
+def dumpb(obj: Any) -> bytes:
+    """Like dumps(), as UTF-8 bytes."""
+    if _use_orjson:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":"), default=str).encode("utf-8")
+
+def loads(data: Union[str, bytes]) -> Any:
+    if _use_orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def status() -> dict:
+    """Which speedups are active, for logs and /stats."""
+    return {
+        "fast_mode": FAST_MODE,
+        "json": "orjson" if _use_orjson else "json",
+        "loop": type(asyncio.get_event_loop_policy()).__module__.split(".")[0],
+    }
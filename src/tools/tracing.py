@@ -0,0 +1,191 @@
+import functools
+import inspect
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from tools import speedups
+
+logger = logging.getLogger(__name__)
+
+TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "false").lower() == "true"
+TRACE_FILE = os.environ.get("TRACE_FILE", "traces.jsonl")
+TRACE_MAX_BYTES = int(os.environ.get("TRACE_MAX_BYTES", str(10 * 1024 * 1024)))
+TRACE_BACKUP_COUNT = int(os.environ.get("TRACE_BACKUP_COUNT", "3"))
+
+class Span:
+    """
+    A timed unit of work (tool call, upstream request, cache lookup, formatting step).
+    Root spans collect all their descendants and are exported as one JSONL line.
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "duration_ms", "attributes", "_root", "_spans")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.start = time.time()
+        self.duration_ms: Optional[float] = None
+        self.attributes = attributes
+        self._root = parent._root if parent else self
+        self._spans: List["Span"] = []
+
+    def set(self, key: str, value: Any) -> None:
+        """Attach an attribute (cache status, payload size, result count...)."""
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+        }
+
+class _NoopSpan:
+    """Returned when tracing is disabled so call sites can always call .set()."""
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+class _JsonlExporter:
+    """Writes finished traces to a size-rotated JSONL file."""
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int):
+        self._logger = logging.getLogger("mcp.traces")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._logger.addHandler(handler)
+
+    def export(self, root: Span) -> None:
+        record = {
+            "trace_id": root.trace_id,
+            "span_id": root.span_id,
+            "name": root.name,
+            "start": root.start,
+            "duration_ms": root.duration_ms,
+            "attributes": root.attributes,
+            "spans": [s.to_dict() for s in root._spans],
+        }
+        self._logger.info(speedups.dumps(record))
+
+class _OtlpExporter:
+    """Replays finished traces into OpenTelemetry (only if the SDK and OTLP exporter are installed)."""
+
+    def __init__(self):
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        provider = TracerProvider(resource=Resource.create({"service.name": "mcp-hotels"}))
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        self._trace = trace
+        self._tracer = provider.get_tracer(__name__)
+
+    def export(self, root: Span) -> None:
+        contexts = {}
+        for s in [root] + root._spans:
+            parent_ctx = contexts.get(s.parent_id)
+            otel_span = self._tracer.start_span(
+                s.name,
+                context=parent_ctx,
+                start_time=int(s.start * 1e9),
+                attributes={k: v if isinstance(v, (str, bool, int, float)) else str(v) for k, v in s.attributes.items()},
+            )
+            contexts[s.span_id] = self._trace.set_span_in_context(otel_span)
+            otel_span.end(end_time=int((s.start + (s.duration_ms or 0) / 1000) * 1e9))
+
+def _build_exporters() -> list:
+    if not TRACING_ENABLED:
+        return []
+    exporters: list = [_JsonlExporter(TRACE_FILE, TRACE_MAX_BYTES, TRACE_BACKUP_COUNT)]
+    if os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        try:
+            exporters.append(_OtlpExporter())
+        except ImportError:
+            logger.warning("OTEL_EXPORTER_OTLP_ENDPOINT is set but opentelemetry-sdk/otlp exporter are not installed")
+    return exporters
+
+_exporters = _build_exporters()
+
+def _export(root: Span) -> None:
+    for exporter in _exporters:
+        try:
+            exporter.export(root)
+        except Exception as e:
+            logger.warning(f"Trace export failed: {e}")
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Time a block of work. Starts a new trace if no span is active (e.g. a tool call),
+    otherwise records a child of the current span.
+    """
+    if not TRACING_ENABLED:
+        yield _NOOP_SPAN
+        return
+    parent = _current_span.get()
+    current = Span(name, parent, attributes)
+    token = _current_span.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.set("error", f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        current.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        _current_span.reset(token)
+        if parent is None:
+            _export(current)
+        else:
+            current._root._spans.append(current)
+
+@contextmanager
+def child_span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Like span(), but only records when a trace is already active (never starts a new one)."""
+    if not TRACING_ENABLED or _current_span.get() is None:
+        yield _NOOP_SPAN
+        return
+    with span(name, **attributes) as current:
+        yield current
+
+def traced_tool(func: Callable) -> Callable:
+    """
+    Decorator for MCP tool functions: wraps each call in a root "tool.<name>" span
+    and records the size of the returned text. Place it below @mcp.tool().
+    """
+    name = f"tool.{func.__name__}"
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with span(name) as current:
+                result = await func(*args, **kwargs)
+                current.set("response_bytes", len(result) if isinstance(result, str) else None)
+                return result
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with span(name) as current:
+            result = func(*args, **kwargs)
+            current.set("response_bytes", len(result) if isinstance(result, str) else None)
+            return result
+    return wrapper
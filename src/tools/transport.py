@@ -0,0 +1,194 @@
+import importlib.util
+import ipaddress
+import logging
+import os
+import socket
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    import httpx
+    import requests
+
+logger = logging.getLogger(__name__)
+
+# Shared upstream connections: one httpx client (meteoblue and other async upstreams) and one
+# requests session (googlemaps) per process, so concurrent calls reuse keep-alive connections
+# instead of opening a TCP/TLS connection each. HTTP/2 needs the optional `h2` package.
+UPSTREAM_HTTP2 = os.environ.get("UPSTREAM_HTTP2", "true").lower() == "true"
+UPSTREAM_MAX_CONNECTIONS = int(os.environ.get("UPSTREAM_MAX_CONNECTIONS", "100"))
+UPSTREAM_MAX_KEEPALIVE = int(os.environ.get("UPSTREAM_MAX_KEEPALIVE", "20"))
+UPSTREAM_KEEPALIVE_EXPIRY = float(os.environ.get("UPSTREAM_KEEPALIVE_EXPIRY", "30"))
+# Seconds resolved addresses are reused for (0 disables the in-process DNS cache)
+DNS_CACHE_TTL = float(os.environ.get("DNS_CACHE_TTL", "60"))
+
+class DNSCache:
+    """TTL cache in front of socket.getaddrinfo (used by both httpx and requests)."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Tuple, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self._getaddrinfo = None
+
+    def install(self) -> None:
+        """Replace socket.getaddrinfo with the cached version (idempotent)."""
+        if self.ttl <= 0 or self._getaddrinfo is not None:
+            return
+        self._getaddrinfo = socket.getaddrinfo
+        socket.getaddrinfo = self.getaddrinfo
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        if not _cacheable_host(host):
+            return self._getaddrinfo(host, port, family, type, proto, flags)
+        key = (host, port, family, type, proto, flags)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return list(entry[1])
+            self.misses += 1
+        # Resolve outside the lock; failures are not cached
+        result = self._getaddrinfo(host, port, family, type, proto, flags)
+        with self._lock:
+            self._entries[key] = (now + self.ttl, result)
+        return list(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"ttl": self.ttl, "entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+def _cacheable_host(host: Any) -> bool:
+    if not host or not isinstance(host, (str, bytes)):
+        return False
+    if isinstance(host, bytes):
+        host = host.decode("ascii", "ignore")
+    try:
+        ipaddress.ip_address(host)
+        return False
+    except ValueError:
+        return True
+
+class ConnectionStats:
+    """Requests vs new connections per upstream host, i.e. how often keep-alive connections are reused."""
+
+    def __init__(self):
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+
+    def _host(self, host: str) -> Dict[str, Any]:
+        return self._hosts.setdefault(host, {"requests": 0, "connections": 0, "http2_requests": 0})
+
+    def record(self, host: str, requests: int = 0, connections: int = 0, http2: int = 0) -> None:
+        stats = self._host(host)
+        stats["requests"] += requests
+        stats["connections"] += connections
+        stats["http2_requests"] += http2
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for host, stats in self._hosts.items():
+            reused = max(0, stats["requests"] - stats["connections"])
+            result[host] = {**stats, "reuse_ratio": round(reused / stats["requests"], 3) if stats["requests"] else None}
+        return result
+
+dns_cache = DNSCache(DNS_CACHE_TTL)
+connection_stats = ConnectionStats()
+_http_client: Optional["httpx.AsyncClient"] = None
+_requests_session: Optional["requests.Session"] = None
+_session_lock = threading.Lock()
+
+def http2_available() -> bool:
+    return UPSTREAM_HTTP2 and importlib.util.find_spec("h2") is not None
+
+async def _add_trace(request: "httpx.Request") -> None:
+    """httpx request hook: count new connections and requests through the httpcore trace extension."""
+    host = request.url.host
+
+    async def trace(event: str, info: Dict[str, Any]) -> None:
+        if event == "connection.connect_tcp.complete":
+            connection_stats.record(host, connections=1)
+        elif event == "http11.send_request_headers.started":
+            connection_stats.record(host, requests=1)
+        elif event == "http2.send_request_headers.started":
+            connection_stats.record(host, requests=1, http2=1)
+
+    request.extensions["trace"] = trace
+
+def http_client() -> "httpx.AsyncClient":
+    """The shared httpx client for async upstream calls (created on first use)."""
+    global _http_client
+    if _http_client is None:
+        import httpx
+
+        dns_cache.install()
+        _http_client = httpx.AsyncClient(
+            http2=http2_available(),
+            timeout=10.0,
+            limits=httpx.Limits(
+                max_connections=UPSTREAM_MAX_CONNECTIONS,
+                max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE,
+                keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY,
+            ),
+            event_hooks={"request": [_add_trace]},
+        )
+        logger.info(f"Upstream HTTP client created (HTTP/2 {'on' if http2_available() else 'off'})")
+    return _http_client
+
+def requests_session() -> "requests.Session":
+    """The shared requests session for googlemaps clients (HTTP/1.1 keep-alive, pooled per host)."""
+    global _requests_session
+    if _requests_session is None:
+        with _session_lock:
+            if _requests_session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                dns_cache.install()
+                session = requests.Session()
+                # pool_maxsize bounds the idle connections kept per host (worker threads share them)
+                adapter = HTTPAdapter(pool_connections=10, pool_maxsize=UPSTREAM_MAX_KEEPALIVE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _requests_session = session
+    return _requests_session
+
+def _session_pool_stats() -> Dict[str, Dict[str, Any]]:
+    # urllib3 pools count the connections they opened and the requests they sent
+    result: Dict[str, Dict[str, Any]] = {}
+    if _requests_session is None:
+        return result
+    for adapter in set(_requests_session.adapters.values()):
+        for key in adapter.poolmanager.pools.keys():
+            pool = adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            requests_sent = pool.num_requests
+            result[pool.host] = {
+                "requests": requests_sent,
+                "connections": pool.num_connections,
+                "http2_requests": 0,
+                "reuse_ratio": round(max(0, requests_sent - pool.num_connections) / requests_sent, 3) if requests_sent else None,
+            }
+    return result
+
+async def aclose() -> None:
+    """Close the shared clients (call on shutdown)."""
+    global _http_client, _requests_session
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    if _requests_session is not None:
+        _requests_session.close()
+        _requests_session = None
+
+def transport_stats() -> Dict[str, Any]:
+    """Connection reuse per upstream host and DNS cache counters, for the /stats endpoint."""
+    return {
+        "http2": http2_available(),
+        "httpx": connection_stats.snapshot(),
+        "requests": _session_pool_stats(),
+        "dns_cache": dns_cache.stats(),
+    }
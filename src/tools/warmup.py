@@ -0,0 +1,33 @@
+import importlib
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Upstream client libraries are imported on first use so the server starts listening sooner.
+# Shortly after startup they are imported in a background thread, so the first tool call
+# does not pay for them either. A negative delay disables the warm-up.
+WARMUP_DELAY = float(os.environ.get("WARMUP_DELAY", "1.0"))
+WARMUP_MODULES = ("googlemaps", "httpx", "numpy")
+
+def warm_up() -> None:
+    """Import the lazily loaded modules (a no-op for those already imported)."""
+    started = time.perf_counter()
+    for name in WARMUP_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            logger.warning(f"Warm-up could not import {name}: {e}")
+    logger.info(f"Warm-up imported {', '.join(WARMUP_MODULES)} in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+def schedule_warm_up(delay: float = WARMUP_DELAY) -> Optional[threading.Timer]:
+    """Run warm_up() in a daemon thread after `delay` seconds (None if disabled)."""
+    if delay < 0:
+        return None
+    timer = threading.Timer(delay, warm_up)
+    timer.daemon = True
+    timer.start()
+    return timer
@@ -1,86 +1,100 @@
-import httpx
+import asyncio
+import copy
 import os
-import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+from tools import providers
+from tools.cache import TTLCache
+from tools.fixtures import MOCK_WEATHER
+from tools.forecast import aggregate_hourly, current_hour_index
+from tools.prefetch import prefetcher
+
+# Created at import (unlike the service) so cache snapshots can be restored into it at startup
+weather_cache = TTLCache("weather", ttl=3600)
 
 class WeatherService:
     def __init__(self):
-        self.api_key = os.environ.get("METEOBLUE_API_KEY")
-        self.base_url = "https://my.meteoblue.com/packages"
-        self.cache: Dict[str, Dict[str, Any]] = {}
-        self.cache_ttl = 3600
-        self._client: Optional[httpx.AsyncClient] = None
-        self._mock_enabled = os.environ.get("MOCK_WEATHER_API", "false").lower() == "true"
-    
-    async def _get_client(self) -> httpx.AsyncClient:
-        """Get or create persistent HTTP client"""
-        if self._client is None:
-            self._client = httpx.AsyncClient(timeout=10.0)
-        return self._client
+        self.cache_ttl = weather_cache.ttl
+        self.cache = weather_cache
+        # Forecasts are snapped to a grid so nearby hotels share one cache entry (0.01° ≈ 1 km)
+        self.grid_degrees = float(os.environ.get("WEATHER_GRID_DEGREES", "0.01"))
+        self.max_concurrency = int(os.environ.get("WEATHER_MAX_CONCURRENCY", "5"))
     
     async def close(self):
-        """Close HTTP client (call on shutdown)"""
-        if self._client:
-            await self._client.aclose()
-            self._client = None
+        """Close HTTP clients (call on shutdown)"""
+        await providers.close()
     
-    async def get_weather(self, latitude: float, longitude: float) -> Dict[str, Any]:
-        """Get current weather and forecast from meteoblue API"""
+    def quantize(self, latitude: float, longitude: float) -> Tuple[float, float]:
+        """Snap coordinates to the weather grid"""
+        if self.grid_degrees <= 0:
+            return latitude, longitude
+        step = self.grid_degrees
+        return round(round(latitude / step) * step, 6), round(round(longitude / step) * step, 6)
+    
+    async def get_weather(self, latitude: float, longitude: float, force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Get current weather and forecast from meteoblue API.
+        force_refresh bypasses the cache (used by the refresh-ahead prefetcher).
+        """
+        latitude, longitude = self.quantize(latitude, longitude)
         cache_key = f"{latitude},{longitude}"
 
-        if self._mock_enabled:
-            return {
-                "metadata": {"name": "Mock City"},
-                "data_1h": {
-                    "time": ["2023-10-27 12:00", "13:00", "14:00", "15:00", "16:00", "17:00"],
-                    "temperature": [22.5, 23.0, 22.0, 21.0, 20.0, 19.0],
-                    "windspeed": [15.0, 10.0, 45.0, 12.0, 10.0, 10.0],
-                    "pictocode": [1, 2, 4, 12, 1, 1] 
-                },
-                "data_day": {
-                    "time": ["2023-10-27"],
-                    "temperature_max": [25.0],
-                    "temperature_min": [18.0]
-                }
-            }
-
-        if not self.api_key:
-            raise ValueError("Meteoblue API Key is required. Set METEOBLUE_API_KEY env var.")
+        if providers.weather.mocked:
+            return copy.deepcopy(MOCK_WEATHER)
 
         # Check cache
-        now = time.time()
-        if cache_key in self.cache:
-            entry = self.cache[cache_key]
-            if now - entry["timestamp"] < self.cache_ttl:
-                return entry["data"]
+        if not force_refresh:
+            prefetcher.record("weather", cache_key, (latitude, longitude))
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
         
         try:
-            client = await self._get_client()
-            url = f"{self.base_url}/basic-1h_basic-day"
-            params = {
-                "apikey": self.api_key,
+            request = {
                 "lat": latitude,
                 "lon": longitude,
                 "format": "json"
             }
-            
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data, provider = await providers.weather.acall("forecast", request)
             
             # Update cache
-            self.cache[cache_key] = {
-                "data": data,
-                "timestamp": now
-            }
+            if provider.cacheable:
+                self.cache.set(cache_key, data)
             
             return data
         except Exception as e:
             # Return cached data if available (expired) as fallback
-            if cache_key in self.cache:
-                return self.cache[cache_key]["data"]
+            stale = self.cache.get_stale(cache_key)
+            if stale is not None:
+                return stale
             raise RuntimeError(f"Error fetching weather data: {str(e)}")
     
+    async def get_weather_many(
+        self, coordinates: List[Tuple[float, float]]
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Get weather for several locations at once.
+        
+        Coordinates are deduplicated after grid quantization, cache hits are answered
+        immediately and misses are fetched concurrently (at most max_concurrency at a time).
+        Returns one entry per input coordinate, in order: the weather data or the exception raised.
+        """
+        unique = list(dict.fromkeys(self.quantize(lat, lng) for lat, lng in coordinates))
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        
+        async def fetch(lat: float, lng: float) -> Dict[str, Any]:
+            if not providers.weather.mocked:
+                cached = self.cache.get(f"{lat},{lng}")
+                if cached is not None:
+                    prefetcher.record("weather", f"{lat},{lng}", (lat, lng))
+                    return cached
+            async with semaphore:
+                return await self.get_weather(lat, lng)
+        
+        results = await asyncio.gather(*(fetch(lat, lng) for lat, lng in unique), return_exceptions=True)
+        by_point = dict(zip(unique, results))
+        return [by_point[self.quantize(lat, lng)] for lat, lng in coordinates]
+    
     def _get_image_for_condition(self, pictocode: int, windspeed: float) -> str:
         """Map meteoblue condition to specific image filenames"""
         if windspeed > 30: 
@@ -141,5 +155,66 @@ class WeatherService:
         except Exception as e:
             return f"Error formatting weather data: {str(e)}"
 
+    def format_weather_forecast(self, weather_data: Dict[str, Any], horizon_hours: int, aggregation: str = "hourly") -> str:
+        """Forecast from the current hour over horizon_hours, aggregated hourly, per 3h/6h or per day"""
+        try:
+            buckets = aggregate_hourly(
+                weather_data.get("data_1h", {}), current_hour_index(weather_data), horizon_hours, aggregation
+            )
+            location = weather_data.get("metadata", {}).get("name") or "Unknown Location"
+            if not buckets:
+                return f"Location: {location}\nNo hourly forecast available."
+
+            lines = [f"Location: {location}", f"Forecast for the next {horizon_hours}h ({aggregation}):"]
+            for bucket in buckets:
+                img = self._get_image_for_condition(bucket["pictocode"] or 1, bucket["wind_max"] or 0)
+                rain = ""
+                if bucket["rain_hours"] is not None:
+                    rain = f", rain {bucket['precipitation']} mm"
+                    if aggregation != "hourly":
+                        rain += f" ({bucket['rain_hours']} rainy h)"
+                if aggregation == "hourly":
+                    temps = f"{bucket['temp_mean']}°C"
+                else:
+                    temps = f"{bucket['temp_min']}–{bucket['temp_max']}°C (avg {bucket['temp_mean']})"
+                lines.append(f"{bucket['label']}: {temps}, wind {bucket['wind_max']}{rain} [{img}]")
+            return "\n".join(lines)
+        except Exception as e:
+            return f"Error formatting weather data: {str(e)}"
+
+    def format_weather_summary(self, weather_data: Dict[str, Any]) -> str:
+        """One-line summary (location, current temp/wind, today's range) for multi-location answers"""
+        try:
+            location = weather_data.get("metadata", {}).get("name") or "Unknown Location"
+            d1h = weather_data.get("data_1h", {})
+            temps = d1h.get("temperature", [])
+            winds = d1h.get("windspeed", [])
+            codes = d1h.get("pictocode", [])
+            day = weather_data.get("data_day", {})
+            temp_max = day.get("temperature_max")
+            temp_min = day.get("temperature_min")
+            
+            curr_temp = temps[0] if temps else "N/A"
+            curr_wind = winds[0] if winds else 0
+            curr_img = self._get_image_for_condition(codes[0] if codes else 1, curr_wind)
+            max_t = temp_max[0] if temp_max else "N/A"
+            min_t = temp_min[0] if temp_min else "N/A"
+            return f"{location}: Now {curr_temp}°C, wind {curr_wind} | Day {min_t}–{max_t}°C | {curr_img}"
+        except Exception as e:
+            return f"Error formatting weather data: {str(e)}"
+
 # Create a singleton instance for use in the server
-weather_service = WeatherService()
\ No newline at end of file
+_weather_service: Optional[WeatherService] = None
+
+def get_weather_service() -> WeatherService:
+    """The shared WeatherService, created on first use."""
+    global _weather_service
+    if _weather_service is None:
+        _weather_service = WeatherService()
+    return _weather_service
+
+prefetcher.register(
+    "weather",
+    weather_cache,
+    lambda coords: get_weather_service().get_weather(*coords, force_refresh=True),
+)